@@ -13,9 +13,14 @@ Uses GPT-4o for reasoning about compliance rules.
 """
 
 from langchain_core.messages import SystemMessage, HumanMessage
+from api.core.constants import EMPTY_DICT
 from api.core.llm import get_primary_llm
+from api.core.llm_cache import cached_ainvoke, discard
+from api.core.llm_json import parse_llm_json
+from api.core.tokens import truncate_tokens
 from api.services.supabase_client import log_audit_event
-import json
+import io
+import orjson
 
 AUDITOR_SYSTEM_PROMPT = """You are the Auditor agent for a dental practice. You ensure compliance and billing accuracy.
 
@@ -61,44 +66,64 @@ CRITICAL RULES:
 - Document everything — your output is part of the audit trail
 """
 
+_SYSTEM_MESSAGE = SystemMessage(content=AUDITOR_SYSTEM_PROMPT)
+
+# Per-agent cap on the serialized output shown to the auditor
+OUTPUT_TOKEN_BUDGET = 500
+
+
+def _compact(value):
+    """Drop None and empty containers, recursively."""
+    if isinstance(value, dict):
+        return {k: c for k, v in value.items() if (c := _compact(v)) not in (None, {}, [])}
+    if isinstance(value, list):
+        return [c for v in value if (c := _compact(v)) not in (None, {}, [])]
+    return value
+
 
 async def run_auditor(
     workspace_id: str,
     patient_ref: str | None = None,
-    prior_outputs: dict = {},
+    prior_outputs: dict | None = None,
 ) -> dict:
     """Run the Auditor agent."""
+    prior_outputs = prior_outputs or EMPTY_DICT
     llm = get_primary_llm()
 
-    context_parts = [f"Workspace: {workspace_id}"]
+    buf = io.StringIO()
+    buf.write(f"Workspace: {workspace_id}\n")
     if patient_ref:
-        context_parts.append(f"Patient ref: {patient_ref}")
+        buf.write(f"Patient ref: {patient_ref}\n")
 
     # Review prior agent outputs for compliance
     if prior_outputs:
-        context_parts.append("\n--- Agent Outputs to Audit ---")
+        buf.write("\n--- Agent Outputs to Audit ---\n")
         for agent_name, output in prior_outputs.items():
-            # Serialize safely
-            output_str = json.dumps(output, default=str)[:2000]
-            context_parts.append(f"\n[{agent_name}]:\n{output_str}")
+            # Serialize once, compactly — empty fields only cost prompt tokens
+            output_str = orjson.dumps(
+                _compact(output), default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+            output_str = truncate_tokens(output_str, OUTPUT_TOKEN_BUDGET)
+            buf.write(f"\n[{agent_name}]:\n{output_str}\n")
 
-    context = "\n".join(context_parts)
+    context = buf.getvalue()
 
     messages = [
-        SystemMessage(content=AUDITOR_SYSTEM_PROMPT),
+        _SYSTEM_MESSAGE,
         HumanMessage(content=f"Perform compliance audit:\n\n{context}"),
     ]
 
     try:
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
-
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-
-        result = json.loads(content)
+        content = await cached_ainvoke(llm, messages)
+
+        try:
+            result = parse_llm_json(content)
+        except ValueError:
+            await discard(llm, messages)
+            raise
+        # A reply reporting an error is not worth replaying for the cache TTL
+        if "error" in (result.get("status"), (result.get("audit_result") or {}).get("status")):
+            await discard(llm, messages)
 
         audit_result = result.get("audit_result", {})
 
@@ -11,9 +11,15 @@ Now equipped with real scheduling tools:
 """
 
 from langchain_core.messages import SystemMessage, HumanMessage
+from api.core.constants import EMPTY_DICT
 from api.core.llm import get_fast_llm
+from api.core.llm_batcher import batcher
+from api.core.local_llm import ainvoke_local
+from api.core.llm_json import StringFieldStream, parse_llm_json
+from api.core.tokens import truncate_tokens
 from api.services.supabase_client import log_audit_event
 from api.services.appointments import (
+    BUSINESS_HOURS,
     lookup_patient_by_name,
     check_availability,
     find_next_available,
@@ -22,7 +28,12 @@ from api.services.appointments import (
     reschedule_appointment,
     get_patient_appointments,
 )
-import json
+import asyncio
+import calendar
+import io
+import orjson
+import re
+from typing import AsyncIterator
 
 CONCIERGE_SYSTEM_PROMPT = """You are the Concierge agent for a dental practice. You are the first point of contact.
 
@@ -84,162 +95,344 @@ CRITICAL RULES:
 - Be warm, professional, efficient
 """
 
+_SYSTEM_MESSAGE = SystemMessage(content=CONCIERGE_SYSTEM_PROMPT)
 
-async def run_concierge(
-    workspace_id: str,
-    patient_ref: str | None = None,
-    intent: str | None = None,
-    payload: dict = {},
+# Cap on the combined context (transcript + tool results) sent to the LLM
+CONTEXT_TOKEN_BUDGET = 2000
+
+# Keyword → pre-fetch tools it triggers. Substring match, longest keyword first,
+# so "reschedule" wins over the "schedule" inside it (its tools are a superset).
+_TOOL_KEYWORDS = {
+    "cancel": ("appointments", "cancel"),
+    "reschedule": ("appointments", "availability"),
+    "move": ("appointments",),
+    "change": ("appointments",),
+    "appointment": ("appointments", "availability"),
+    "book": ("availability",),
+    "schedule": ("availability",),
+    "available": ("availability",),
+    "opening": ("availability",),
+    "next": ("availability",),
+}
+_TOOL_KEYWORD_RE = re.compile("|".join(sorted(map(re.escape, _TOOL_KEYWORDS), key=len, reverse=True)))
+
+
+def _tool_hits(text: str) -> set[str]:
+    """Single scan of the lowercased message for every tool trigger."""
+    return {tool for m in _TOOL_KEYWORD_RE.finditer(text) for tool in _TOOL_KEYWORDS[m.group()]}
+
+
+async def _tool_lookup_patient(workspace_id: str, patient_name: str, tool_results: dict) -> tuple[list[str], str | None]:
+    """Verify the caller by name. Returns (context lines, patient_ref if found)."""
+    try:
+        lookup = await lookup_patient_by_name(workspace_id, patient_name)
+        tool_results["patient_lookup"] = lookup
+
+        if lookup["found"] and lookup["patient"]:
+            patient_ref = lookup["patient"]["id"]
+            return [
+                f"\n✅ Patient verified: {lookup['patient']['full_name']} "
+                f"(ID: {patient_ref})"
+            ], patient_ref
+        if lookup["candidates"]:
+            names = ", ".join(c["full_name"] for c in lookup["candidates"])
+            return [
+                f"\n⚠️ Multiple patients match '{patient_name}': {names}. "
+                f"Ask the caller to clarify."
+            ], None
+        return [
+            f"\n❌ No patient named '{patient_name}' found. "
+            f"They may need to register as a new patient first."
+        ], None
+    except Exception as e:
+        return [f"\nPatient lookup failed: {e}"], None
+
+
+async def _tool_patient_appointments(workspace_id: str, patient_ref: str, tool_results: dict) -> list[str]:
+    try:
+        patient_appts = await get_patient_appointments(workspace_id, patient_ref)
+        tool_results["patient_appointments"] = patient_appts
+        if not patient_appts:
+            return ["\nPatient has no upcoming appointments."]
+        lines = [f"\nPatient's upcoming appointments:"]
+        for appt in patient_appts:
+            lines.append(
+                f"  - ID: {appt['id']} | {appt['appointment_type']} | "
+                f"{appt['start_time'][:10]} at {appt['start_time'][11:16]} | "
+                f"Status: {appt['status']}"
+            )
+        return lines
+    except Exception as e:
+        return [f"\nFailed to fetch appointments: {e}"]
+
+
+async def _tool_availability(workspace_id: str, tool_results: dict) -> list[str]:
+    try:
+        next_slots = await find_next_available(workspace_id, duration_minutes=30, max_results=3)
+        if not next_slots:
+            return ["\nNo available slots found in the next 14 days."]
+        lines = [f"\nNext available slots (30 min):"]
+        for day in next_slots:
+            slots_str = ", ".join([s["start"] for s in day["slots"]])
+            lines.append(f"  - {day['day_name']} {day['date']}: {slots_str}")
+        tool_results["availability"] = next_slots
+        return lines
+    except Exception as e:
+        return [f"\nFailed to check availability: {e}"]
+
+
+async def _tool_cancel(workspace_id: str, patient_ref: str, tool_results: dict) -> list[str]:
+    try:
+        cancel_result = await cancel_appointment(
+            workspace_id=workspace_id,
+            patient_id=patient_ref,
+            reason="Patient requested cancellation via Concierge",
+        )
+        tool_results["cancellation"] = cancel_result
+        if not cancel_result.get("success"):
+            return [f"\n❌ Could not cancel: {cancel_result.get('error')}"]
+        cancelled = cancel_result["cancelled_appointment"]
+        lines = [
+            f"\n✅ CANCELLED appointment: {cancelled['type']} on "
+            f"{cancelled['date']} at {cancelled['time']}"
+        ]
+        if cancel_result.get("suggested_reschedule"):
+            lines.append("Suggested reschedule options:")
+            for day in cancel_result["suggested_reschedule"]:
+                slots_str = ", ".join([s["start"] for s in day["slots"]])
+                lines.append(f"  - {day['day_name']} {day['date']}: {slots_str}")
+        return lines
+    except Exception as e:
+        return [f"\nCancellation failed: {e}"]
+
+
+async def _skipped(result):
+    return result
+
+
+# ── Rule-based fast path ─────────────────────────────────────────────
+# Messages these rules classify confidently are answered without an LLM call.
+
+RULE_MIN_CONFIDENCE = 0.85
+
+# Only hours *questions* — "a few hours ago" or "please close my account" aren't
+_HOURS_RE = re.compile(
+    r"\b((your|office|opening|business|clinic) hours"
+    r"|(what|which) are the hours"
+    r"|(opening|closing) times?"
+    r"|(are|is) (you|the office|the clinic|it) (still )?(open|closed)"
+    r"|(what time|when) (do|does|are|is) .*\b(open|opens|close|closes|closed)"
+    r")\b"
+)
+_URGENT_RE = re.compile(r"\b(pain|hurts?|bleeding|swelling|swollen|emergency|trauma|broken?)\b")
+
+
+def _clock(hour: int) -> str:
+    return f"{hour % 12 or 12}:00 {'AM' if hour < 12 else 'PM'}"
+
+
+_CANNED_RESPONSES = {
+    "hours": (
+        f"We're open {calendar.day_name[BUSINESS_HOURS['days'][0]]} to "
+        f"{calendar.day_name[BUSINESS_HOURS['days'][-1]]}, "
+        f"{_clock(BUSINESS_HOURS['start'])} to {_clock(BUSINESS_HOURS['end'])}."
+    ),
+}
+
+
+def classify_rule_based(text: str, tool_results: dict) -> tuple[str | None, float, str | None]:
+    """
+    Classify a lowercased message by keyword rules.
+    Returns (intent, confidence, canned response) — (None, 0.0, None) when no rule applies.
+    """
+    if not text or _URGENT_RE.search(text):
+        return None, 0.0, None
+
+    keywords = {m.group() for m in _TOOL_KEYWORD_RE.finditer(text)}
+
+    # Plain cancellation that the pre-fetch already carried out
+    cancellation = tool_results.get("cancellation") or {}
+    if "cancel" in keywords and keywords <= {"cancel", "appointment"} and cancellation.get("success"):
+        cancelled = cancellation["cancelled_appointment"]
+        response = (
+            f"Your {cancelled['type'].replace('_', ' ')} appointment on {cancelled['date']} "
+            f"at {cancelled['time']} has been cancelled."
+        )
+        if cancellation.get("suggested_reschedule"):
+            options = "; ".join(
+                f"{day['day_name']} {day['date']} at {', '.join(s['start'] for s in day['slots'])}"
+                for day in cancellation["suggested_reschedule"]
+            )
+            response += f" If you'd like to rebook, our next openings are {options}."
+        return "schedule_change", 0.95, response
+
+    if not keywords and _HOURS_RE.search(text):
+        return "general_inquiry", 0.9, _CANNED_RESPONSES["hours"]
+
+    return None, 0.0, None
+
+
+def _rule_result(
+    intent: str,
+    confidence: float,
+    response: str,
+    patient_ref: str | None,
+    tool_results: dict,
 ) -> dict:
-    """Run the Concierge agent with real scheduling tools."""
-    llm = get_fast_llm()
+    return {
+        "patient_identified": bool(patient_ref),
+        "patient_ref": patient_ref,
+        "refined_intent": intent,
+        "confidence": confidence,
+        "can_handle": True,
+        "response": response,
+        "action_taken": "cancel_appointment" if "cancellation" in tool_results else None,
+        "tool_results": tool_results,
+        "escalate": False,
+        "escalation_reason": None,
+        "notes": "Handled by keyword rules",
+    }
 
-    # Build context
-    context_parts = [f"Workspace: {workspace_id}"]
+
+async def _try_rules(
+    workspace_id: str,
+    patient_ref: str | None,
+    payload: dict,
+    tool_results: dict,
+) -> dict | None:
+    """Return a finished result when a keyword rule is confident enough, else None."""
+    intent, confidence, response = classify_rule_based((payload.get("text") or "").lower(), tool_results)
+    if response is None or confidence < RULE_MIN_CONFIDENCE:
+        return None
+    result = _rule_result(intent, confidence, response, patient_ref, tool_results)
+    await _log_classification(workspace_id, patient_ref, result, tool_results)
+    return result
+
+
+async def _prefetch_context(
+    workspace_id: str,
+    patient_ref: str | None,
+    intent: str | None,
+    payload: dict,
+) -> tuple[str, str | None, dict]:
+    """
+    Run the scheduling tools the message calls for and build the LLM context.
+    Returns (context, patient_ref, tool_results) — patient_ref may be filled in by the name lookup.
+
+    Tools run in two concurrent waves: name lookup + availability first (neither
+    needs a patient_ref), then appointments + cancellation once the patient is known.
+    """
+    buf = io.StringIO()
+    buf.write(f"Workspace: {workspace_id}\n")
     if patient_ref:
-        context_parts.append(f"Patient ref: {patient_ref}")
+        buf.write(f"Patient ref: {patient_ref}\n")
     if intent:
-        context_parts.append(f"Initial intent classification: {intent}")
+        buf.write(f"Initial intent classification: {intent}\n")
     if payload.get("text"):
-        context_parts.append(f"Patient message: {payload['text']}")
+        buf.write(f"Patient message: {payload['text']}\n")
     if payload.get("channel"):
-        context_parts.append(f"Channel: {payload['channel']}")
+        buf.write(f"Channel: {payload['channel']}\n")
 
     # Pre-fetch data based on likely intent
-    tool_context = []
     tool_results = {}
-
     text = (payload.get("text") or "").lower()
 
-    # ── Step 0: Patient name lookup ──────────────────────────────────
     # If a patient_name is provided in payload (from Vapi or frontend)
-    # OR no patient_ref yet, try to identify the patient by name.
+    # and no patient_ref yet, try to identify the patient by name.
     patient_name = payload.get("patient_name")
-    if patient_name and not patient_ref:
-        try:
-            lookup = await lookup_patient_by_name(workspace_id, patient_name)
-            tool_results["patient_lookup"] = lookup
-
-            if lookup["found"] and lookup["patient"]:
-                patient_ref = lookup["patient"]["id"]
-                context_parts.append(f"Patient ref: {patient_ref}")
-                tool_context.append(
-                    f"\n✅ Patient verified: {lookup['patient']['full_name']} "
-                    f"(ID: {patient_ref})"
-                )
-            elif lookup["candidates"]:
-                names = ", ".join(c["full_name"] for c in lookup["candidates"])
-                tool_context.append(
-                    f"\n⚠️ Multiple patients match '{patient_name}': {names}. "
-                    f"Ask the caller to clarify."
-                )
-            else:
-                tool_context.append(
-                    f"\n❌ No patient named '{patient_name}' found. "
-                    f"They may need to register as a new patient first."
-                )
-        except Exception as e:
-            tool_context.append(f"\nPatient lookup failed: {e}")
-
-    # If patient wants to cancel or reschedule, get their appointments
-    if patient_ref and any(w in text for w in ["cancel", "reschedule", "move", "change", "appointment"]):
-        try:
-            patient_appts = await get_patient_appointments(workspace_id, patient_ref)
-            if patient_appts:
-                tool_context.append(f"\nPatient's upcoming appointments:")
-                for appt in patient_appts:
-                    tool_context.append(
-                        f"  - ID: {appt['id']} | {appt['appointment_type']} | "
-                        f"{appt['start_time'][:10]} at {appt['start_time'][11:16]} | "
-                        f"Status: {appt['status']}"
-                    )
-                tool_results["patient_appointments"] = patient_appts
-            else:
-                tool_context.append("\nPatient has no upcoming appointments.")
-                tool_results["patient_appointments"] = []
-        except Exception as e:
-            tool_context.append(f"\nFailed to fetch appointments: {e}")
-
-    # If patient wants to book or reschedule, get availability
-    if any(w in text for w in ["book", "schedule", "appointment", "available", "opening", "reschedule", "next"]):
-        try:
-            next_slots = await find_next_available(workspace_id, duration_minutes=30, max_results=3)
-            if next_slots:
-                tool_context.append(f"\nNext available slots (30 min):")
-                for day in next_slots:
-                    slots_str = ", ".join([s["start"] for s in day["slots"]])
-                    tool_context.append(f"  - {day['day_name']} {day['date']}: {slots_str}")
-                tool_results["availability"] = next_slots
-            else:
-                tool_context.append("\nNo available slots found in the next 14 days.")
-        except Exception as e:
-            tool_context.append(f"\nFailed to check availability: {e}")
-
-    # If patient wants to cancel
-    if patient_ref and any(w in text for w in ["cancel"]):
-        try:
-            cancel_result = await cancel_appointment(
-                workspace_id=workspace_id,
-                patient_id=patient_ref,
-                reason="Patient requested cancellation via Concierge",
-            )
-            tool_results["cancellation"] = cancel_result
-            if cancel_result.get("success"):
-                cancelled = cancel_result["cancelled_appointment"]
-                tool_context.append(
-                    f"\n✅ CANCELLED appointment: {cancelled['type']} on "
-                    f"{cancelled['date']} at {cancelled['time']}"
-                )
-                if cancel_result.get("suggested_reschedule"):
-                    tool_context.append("Suggested reschedule options:")
-                    for day in cancel_result["suggested_reschedule"]:
-                        slots_str = ", ".join([s["start"] for s in day["slots"]])
-                        tool_context.append(f"  - {day['day_name']} {day['date']}: {slots_str}")
-            else:
-                tool_context.append(f"\n❌ Could not cancel: {cancel_result.get('error')}")
-        except Exception as e:
-            tool_context.append(f"\nCancellation failed: {e}")
-
-    context = "\n".join(context_parts + tool_context)
-
-    messages = [
-        SystemMessage(content=CONCIERGE_SYSTEM_PROMPT),
+    needs_lookup = bool(patient_name and not patient_ref)
+    hits = _tool_hits(text)
+    needs_availability = "availability" in hits
+
+    # ── Wave 1: lookup + availability ────────────────────────────────
+    (lookup_lines, found_ref), availability_lines = await asyncio.gather(
+        _tool_lookup_patient(workspace_id, patient_name, tool_results) if needs_lookup else _skipped(([], None)),
+        _tool_availability(workspace_id, tool_results) if needs_availability else _skipped([]),
+    )
+    if found_ref:
+        patient_ref = found_ref
+        buf.write(f"Patient ref: {patient_ref}\n")
+
+    # ── Wave 2: appointments + cancellation (need patient_ref) ───────
+    needs_appointments = bool(patient_ref) and "appointments" in hits
+    needs_cancel = bool(patient_ref) and "cancel" in hits
+
+    appointment_lines, cancel_lines = await asyncio.gather(
+        _tool_patient_appointments(workspace_id, patient_ref, tool_results) if needs_appointments else _skipped([]),
+        _tool_cancel(workspace_id, patient_ref, tool_results) if needs_cancel else _skipped([]),
+    )
+
+    for lines in (lookup_lines, appointment_lines, availability_lines, cancel_lines):
+        buf.writelines(f"{line}\n" for line in lines)
+    context = truncate_tokens(buf.getvalue(), CONTEXT_TOKEN_BUDGET)
+    return context, patient_ref, tool_results
+
+
+def _build_messages(context: str) -> list:
+    return [
+        _SYSTEM_MESSAGE,
         HumanMessage(content=f"Process this interaction:\n\n{context}"),
     ]
 
-    try:
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
 
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
+def _error_result(patient_ref: str | None, tool_results: dict, error: Exception) -> dict:
+    return {
+        "patient_identified": False,
+        "patient_ref": patient_ref,
+        "refined_intent": "error",
+        "confidence": 0.0,
+        "can_handle": False,
+        "response": None,
+        "action_taken": None,
+        "tool_results": tool_results,
+        "escalate": False,
+        "escalation_reason": f"Concierge error: {str(error)}",
+        "notes": None,
+        "error": True,
+    }
 
-        result = json.loads(content)
+
+async def _log_classification(
+    workspace_id: str,
+    patient_ref: str | None,
+    result: dict,
+    tool_results: dict,
+) -> None:
+    await log_audit_event(
+        workspace_id=workspace_id,
+        actor_type="agent",
+        actor_id="concierge",
+        action="intent_classified",
+        resource_type="patient" if patient_ref else None,
+        resource_id=patient_ref,
+        metadata={
+            "intent": result.get("refined_intent"),
+            "confidence": result.get("confidence"),
+            "can_handle": result.get("can_handle"),
+            "action_taken": result.get("action_taken"),
+            "tools_used": list(tool_results.keys()),
+        },
+    )
+
+
+async def _finalize(
+    raw_content: str,
+    workspace_id: str,
+    patient_ref: str | None,
+    intent: str | None,
+    tool_results: dict,
+) -> dict:
+    """Parse the LLM reply, merge tool results, and log the classification."""
+    try:
+        result = parse_llm_json(raw_content)
 
         # Merge tool results into the response
         result["tool_results"] = tool_results
 
-        await log_audit_event(
-            workspace_id=workspace_id,
-            actor_type="agent",
-            actor_id="concierge",
-            action="intent_classified",
-            resource_type="patient" if patient_ref else None,
-            resource_id=patient_ref,
-            metadata={
-                "intent": result.get("refined_intent"),
-                "confidence": result.get("confidence"),
-                "can_handle": result.get("can_handle"),
-                "action_taken": result.get("action_taken"),
-                "tools_used": list(tool_results.keys()),
-            },
-        )
-
+        await _log_classification(workspace_id, patient_ref, result, tool_results)
         return result
 
-    except json.JSONDecodeError:
+    except ValueError:
         return {
             "patient_identified": False,
             "patient_ref": patient_ref,
@@ -251,21 +444,83 @@ async def run_concierge(
             "tool_results": tool_results,
             "escalate": False,
             "escalation_reason": None,
-            "notes": f"Failed to parse LLM response: {response.content[:200]}",
+            "notes": f"Failed to parse LLM response: {raw_content[:200]}",
             "error": True,
         }
     except Exception as e:
-        return {
-            "patient_identified": False,
-            "patient_ref": patient_ref,
-            "refined_intent": "error",
-            "confidence": 0.0,
-            "can_handle": False,
-            "response": None,
-            "action_taken": None,
-            "tool_results": tool_results,
-            "escalate": False,
-            "escalation_reason": f"Concierge error: {str(e)}",
-            "notes": None,
-            "error": True,
-        }
+        return _error_result(patient_ref, tool_results, e)
+
+
+async def run_concierge(
+    workspace_id: str,
+    patient_ref: str | None = None,
+    intent: str | None = None,
+    payload: dict | None = None,
+) -> dict:
+    """Run the Concierge agent with real scheduling tools."""
+    payload = payload or EMPTY_DICT
+    context, patient_ref, tool_results = await _prefetch_context(workspace_id, patient_ref, intent, payload)
+
+    if (result := await _try_rules(workspace_id, patient_ref, payload, tool_results)) is not None:
+        return result
+
+    messages = _build_messages(context)
+
+    try:
+        # Local quantized model first; hosted fast tier only when it is unsure
+        content = await ainvoke_local(messages)
+        if content is None:
+            response = await batcher.ainvoke(get_fast_llm(), messages)
+            content = response.content
+    except Exception as e:
+        return _error_result(patient_ref, tool_results, e)
+
+    return await _finalize(content, workspace_id, patient_ref, intent, tool_results)
+
+
+def _sse(data: dict) -> bytes:
+    return b"data: " + orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
+async def stream_concierge(
+    workspace_id: str,
+    patient_ref: str | None = None,
+    intent: str | None = None,
+    payload: dict | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the Concierge reply as Server-Sent Events.
+
+    Emits `{"delta": ...}` frames with the patient-facing `response` text as it
+    arrives, then a final `{"result": ...}` frame with the same dict
+    `run_concierge` returns. Uses the same tiers as run_concierge; a reply from
+    the local model arrives whole, so it is sent as a single delta.
+    """
+    payload = payload or EMPTY_DICT
+    context, patient_ref, tool_results = await _prefetch_context(workspace_id, patient_ref, intent, payload)
+
+    if (result := await _try_rules(workspace_id, patient_ref, payload, tool_results)) is not None:
+        yield _sse({"result": result})
+        return
+
+    messages = _build_messages(context)
+    try:
+        content = await ainvoke_local(messages)
+        if content is None:
+            chunks = []
+            response_text = StringFieldStream("response")
+            async for chunk in batcher.astream(get_fast_llm(), messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    if delta := response_text.feed(chunk.content):
+                        yield _sse({"delta": delta})
+            content = "".join(chunks)
+        else:
+            if delta := StringFieldStream("response").feed(content):
+                yield _sse({"delta": delta})
+    except Exception as e:
+        yield _sse({"result": _error_result(patient_ref, tool_results, e)})
+        return
+
+    result = await _finalize(content, workspace_id, patient_ref, intent, tool_results)
+    yield _sse({"result": result})
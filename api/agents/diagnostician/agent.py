@@ -12,9 +12,12 @@ NEVER outputs PII — only references external_ref tokens.
 """
 
 from langchain_core.messages import SystemMessage, HumanMessage
+from api.core.constants import EMPTY_DICT
 from api.core.llm import get_primary_llm
+from api.core.llm_cache import cached_ainvoke, discard
+from api.core.llm_json import parse_llm_json
 from api.services.supabase_client import log_audit_event
-import json
+import io
 
 DIAGNOSTICIAN_SYSTEM_PROMPT = """You are the Diagnostician agent for a dental practice. You provide clinical intelligence.
 
@@ -54,47 +57,52 @@ CRITICAL RULES:
 - Use proper dental terminology (CDT codes, ADA classifications)
 """
 
+_SYSTEM_MESSAGE = SystemMessage(content=DIAGNOSTICIAN_SYSTEM_PROMPT)
+
 
 async def run_diagnostician(
     workspace_id: str,
     patient_ref: str | None = None,
-    prior_outputs: dict = {},
+    prior_outputs: dict | None = None,
 ) -> dict:
     """Run the Diagnostician agent."""
+    prior_outputs = prior_outputs or EMPTY_DICT
     llm = get_primary_llm()
 
-    context_parts = [f"Workspace: {workspace_id}"]
+    buf = io.StringIO()
+    buf.write(f"Workspace: {workspace_id}\n")
     if patient_ref:
-        context_parts.append(f"Patient ref: {patient_ref}")
+        buf.write(f"Patient ref: {patient_ref}\n")
     else:
-        context_parts.append("No specific patient — general analysis requested")
+        buf.write("No specific patient — general analysis requested\n")
 
     if prior_outputs.get("concierge"):
         concierge = prior_outputs["concierge"]
-        context_parts.append(f"Concierge intent: {concierge.get('refined_intent', 'unknown')}")
+        buf.write(f"Concierge intent: {concierge.get('refined_intent', 'unknown')}\n")
         if concierge.get("notes"):
-            context_parts.append(f"Concierge notes: {concierge['notes']}")
+            buf.write(f"Concierge notes: {concierge['notes']}\n")
 
     # TODO: Fetch actual clinical data from Supabase
-    context_parts.append("\n[Note: Clinical data integration pending — generating template briefing]")
+    buf.write("\n[Note: Clinical data integration pending — generating template briefing]\n")
 
-    context = "\n".join(context_parts)
+    context = buf.getvalue()
 
     messages = [
-        SystemMessage(content=DIAGNOSTICIAN_SYSTEM_PROMPT),
+        _SYSTEM_MESSAGE,
         HumanMessage(content=f"Generate clinical intelligence:\n\n{context}"),
     ]
 
     try:
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
-
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-
-        result = json.loads(content)
+        content = await cached_ainvoke(llm, messages)
+
+        try:
+            result = parse_llm_json(content)
+        except ValueError:
+            await discard(llm, messages)
+            raise
+        # A reply reporting an error is not worth replaying for the cache TTL
+        if result.get("status") == "error":
+            await discard(llm, messages)
 
         await log_audit_event(
             workspace_id=workspace_id,
@@ -12,9 +12,12 @@ Uses GPT-4o-mini for template generation.
 """
 
 from langchain_core.messages import SystemMessage, HumanMessage
+from api.core.constants import EMPTY_DICT
 from api.core.llm import get_fast_llm
+from api.core.llm_batcher import batcher
+from api.core.llm_json import parse_llm_json
 from api.services.supabase_client import log_audit_event
-import json
+import io
 
 LIAISON_SYSTEM_PROMPT = """You are the Liaison agent for a dental practice. You handle all outbound communications.
 
@@ -59,59 +62,59 @@ CRITICAL RULES:
 - Multi-language: draft in patient's preferred language
 """
 
+_SYSTEM_MESSAGE = SystemMessage(content=LIAISON_SYSTEM_PROMPT)
+
+
+# (path into prior_outputs, field, context line, default when the path exists but the field doesn't)
+_CONTEXT_FIELDS = (
+    (("concierge",), "refined_intent", "Intent: {}", "general_inquiry"),
+    (("concierge",), "response", "Concierge response to patient: {}", None),
+    (("diagnostician", "briefing_card"), "treatment_gaps", "Treatment gaps found: {}", None),
+    (("diagnostician", "briefing_card"), "next_recommended", "Recommended next step: {}", None),
+    (("auditor",), "balance_info", "Balance info: {}", None),
+)
+
+
+def _dig(prior_outputs, path: tuple[str, ...]):
+    node = prior_outputs
+    for key in path:
+        node = node.get(key)
+        if not node:
+            return None
+    return node
+
+
+def _build_messages(workspace_id: str, patient_ref: str | None, prior_outputs) -> list:
+    buf = io.StringIO()
+    buf.write(f"Workspace: {workspace_id}\n")
+    if patient_ref:
+        buf.write(f"Patient ref: {patient_ref}\n")
+
+    # Communication context from prior outputs
+    for path, field, line, default in _CONTEXT_FIELDS:
+        node = _dig(prior_outputs, path)
+        if node and (value := node.get(field, default)):
+            buf.write(line.format(value))
+            buf.write("\n")
+
+    return [
+        _SYSTEM_MESSAGE,
+        HumanMessage(content=f"Draft communications based on this context:\n\n{buf.getvalue()}"),
+    ]
+
 
 async def run_liaison(
     workspace_id: str,
     patient_ref: str | None = None,
-    prior_outputs: dict = {},
+    prior_outputs: dict | None = None,
 ) -> dict:
     """Run the Liaison agent."""
-    llm = get_fast_llm()
-
-    context_parts = [f"Workspace: {workspace_id}"]
-    if patient_ref:
-        context_parts.append(f"Patient ref: {patient_ref}")
-
-    # Determine communication context from prior outputs
-    if prior_outputs.get("concierge"):
-        concierge = prior_outputs["concierge"]
-        intent = concierge.get("refined_intent", "general_inquiry")
-        context_parts.append(f"Intent: {intent}")
-        if concierge.get("response"):
-            context_parts.append(f"Concierge response to patient: {concierge['response']}")
-
-    if prior_outputs.get("diagnostician"):
-        diag = prior_outputs["diagnostician"]
-        card = diag.get("briefing_card", {})
-        if card.get("treatment_gaps"):
-            context_parts.append(f"Treatment gaps found: {card['treatment_gaps']}")
-        if card.get("next_recommended"):
-            context_parts.append(f"Recommended next step: {card['next_recommended']}")
-
-    if prior_outputs.get("auditor"):
-        auditor = prior_outputs["auditor"]
-        if auditor.get("balance_info"):
-            context_parts.append(f"Balance info: {auditor['balance_info']}")
-
-    context = "\n".join(context_parts)
-
-    messages = [
-        SystemMessage(content=LIAISON_SYSTEM_PROMPT),
-        HumanMessage(content=f"Draft communications based on this context:\n\n{context}"),
-    ]
+    prior_outputs = prior_outputs or EMPTY_DICT
+    messages = _build_messages(workspace_id, patient_ref, prior_outputs)
 
     try:
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
-
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-
-        result = json.loads(content)
-
-        msg_count = len(result.get("messages", []))
+        response = await batcher.ainvoke(get_fast_llm(), messages)
+        result = parse_llm_json(response.content)
 
         await log_audit_event(
             workspace_id=workspace_id,
@@ -121,7 +124,7 @@ async def run_liaison(
             resource_type="patient" if patient_ref else None,
             resource_id=patient_ref,
             metadata={
-                "message_count": msg_count,
+                "message_count": len(result.get("messages", [])),
                 "channels": list({m.get("channel") for m in result.get("messages", [])}),
             },
         )
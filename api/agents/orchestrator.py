@@ -5,11 +5,18 @@ Uses LangGraph to coordinate agents through interaction patterns:
 - Sequential: Concierge → Diagnostician → Liaison (standard patient flow)
 - Parallel: Diagnostician + Auditor run simultaneously (briefing + compliance)
 - Conditional: Route based on intent classification
+
+Each step is checkpointed per interaction, so a failed interaction can be
+re-triggered with its interaction_id and resume after the last completed node.
 """
 
+import re
+from time import perf_counter_ns
 import uuid
-from datetime import datetime
+from collections import OrderedDict
+from types import MappingProxyType
 from typing import TypedDict, Annotated, Literal
+from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, END
 from api.models.schemas import InteractionState, TriggerEvent
 from api.agents.concierge.agent import run_concierge
@@ -19,6 +26,23 @@ from api.agents.auditor.agent import run_auditor
 from api.services.supabase_client import log_audit_event
 
 
+# SMS keyword → intent. Matched at word starts ("payment", "cancelled") in one pass;
+# when several intents hit, the earliest in _SMS_INTENT_PRIORITY wins.
+_SMS_KEYWORDS = {
+    "cancel": "schedule_change",
+    "reschedule": "schedule_change",
+    "move": "schedule_change",
+    "confirm": "appointment_confirm",
+    "yes": "appointment_confirm",
+    "bill": "billing_inquiry",
+    "pay": "billing_inquiry",
+    "charge": "billing_inquiry",
+    "insurance": "billing_inquiry",
+}
+_SMS_INTENT_PRIORITY = ("schedule_change", "appointment_confirm", "billing_inquiry")
+_SMS_KEYWORD_RE = re.compile(r"\b(" + "|".join(_SMS_KEYWORDS) + ")")
+
+
 class OrchestratorState(TypedDict):
     interaction_id: str
     workspace_id: str
@@ -44,15 +68,7 @@ def classify_intent(state: OrchestratorState) -> OrchestratorState:
     if trigger == "inbound_call":
         state["intent"] = payload.get("intent", "appointment_request")
     elif trigger == "inbound_sms":
-        text = payload.get("text", "").lower()
-        if any(w in text for w in ["cancel", "reschedule", "move"]):
-            state["intent"] = "schedule_change"
-        elif any(w in text for w in ["confirm", "yes"]):
-            state["intent"] = "appointment_confirm"
-        elif any(w in text for w in ["bill", "pay", "charge", "insurance"]):
-            state["intent"] = "billing_inquiry"
-        else:
-            state["intent"] = "general_inquiry"
+        state["intent"] = classify_sms_batch([payload.get("text", "")])[0]
     elif trigger == "manual_trigger":
         state["intent"] = payload.get("intent", "manual")
     elif trigger == "scheduled_job":
@@ -64,59 +80,104 @@ def classify_intent(state: OrchestratorState) -> OrchestratorState:
     return state
 
 
-def route_to_agent(state: OrchestratorState) -> str:
-    """Routing function — decides which agent runs next based on intent."""
-    intent = state["intent"]
-    outputs = state["agent_outputs"]
+CLINICAL_INTENTS = frozenset({"clinical_question", "treatment_plan", "chart_review"})
+BILLING_INTENTS = frozenset({"billing_inquiry", "insurance_question"})
+INBOUND_TRIGGERS = frozenset({"inbound_call", "inbound_sms", "web_chat"})
+
+_AGENTS = ("concierge", "diagnostician", "liaison", "auditor")
+_TRIGGERS = INBOUND_TRIGGERS | {"manual_trigger", "scheduled_job"}
+_ROUTED_INTENTS = CLINICAL_INTENTS | BILLING_INTENTS
+_MANUAL = object()  # route to the agent named in the manual trigger's payload
+_MANUAL_AGENTS = frozenset(_AGENTS)  # agents a manual trigger may name
 
-    # Only hard-stop for real emergencies
-    if state["escalated"]:
-        escalation = state.get("escalation_reason", "")
-        is_emergency = any(w in escalation.lower() for w in ["emergency", "severe pain", "trauma", "bleeding"])
-        if is_emergency:
-            return "finalize"
-        # Otherwise, clear escalation and continue routing
-        state["escalated"] = False
 
+def _route(trigger: str | None, done: frozenset, refined_intent: str | None):
+    """The routing rules. Evaluated once per combination to build _ROUTES."""
     # First pass — always start with Concierge for inbound
-    if "concierge" not in outputs and state["trigger_type"] in ("inbound_call", "inbound_sms", "web_chat"):
+    if "concierge" not in done and trigger in INBOUND_TRIGGERS:
         return "concierge"
 
     # After Concierge, route by intent
-    if "concierge" in outputs:
-        refined_intent = outputs["concierge"].get("refined_intent", intent)
-
+    if "concierge" in done:
         # Clinical intents → Diagnostician first
-        if refined_intent in ("clinical_question", "treatment_plan", "chart_review"):
-            if "diagnostician" not in outputs:
+        if refined_intent in CLINICAL_INTENTS:
+            if "diagnostician" not in done:
                 return "diagnostician"
 
         # Billing intents → Auditor for billing
-        if refined_intent in ("billing_inquiry", "insurance_question"):
-            if "auditor" not in outputs:
+        if refined_intent in BILLING_INTENTS:
+            if "auditor" not in done:
                 return "auditor"
 
         # Liaison drafts communications
-        if "liaison" not in outputs:
+        if "liaison" not in done:
             return "liaison"
 
         # Auditor always runs last — compliance check on all outputs
-        if "auditor" not in outputs:
+        if "auditor" not in done:
             return "auditor"
 
     # Manual triggers go directly to the specified agent
-    if state["trigger_type"] == "manual_trigger":
-        target = state["payload"].get("agent", "concierge")
-        if target not in outputs:
-            return target
+    if trigger == "manual_trigger":
+        return _MANUAL
 
     # Scheduled jobs go to Liaison
-    if state["trigger_type"] == "scheduled_job" and "liaison" not in outputs:
+    if trigger == "scheduled_job" and "liaison" not in done:
         return "liaison"
 
     return "finalize"
 
 
+# (trigger, agents already run, refined intent) → next node. Triggers and intents
+# the rules don't distinguish are keyed as None.
+_ROUTES = {
+    (trigger, done, intent): _route(trigger, done, intent)
+    for trigger in (*_TRIGGERS, None)
+    for done in (
+        frozenset(a for i, a in enumerate(_AGENTS) if mask >> i & 1)
+        for mask in range(1 << len(_AGENTS))
+    )
+    for intent in (*_ROUTED_INTENTS, None)
+}
+
+
+def _sms_intent(found: set[str]) -> str:
+    return next((i for i in _SMS_INTENT_PRIORITY if i in found), "general_inquiry")
+
+
+def classify_sms_batch(texts: list[str]) -> list[str]:
+    """Classify many SMS bodies (e.g. a recall campaign's replies) with classify_intent's rules."""
+    findall = _SMS_KEYWORD_RE.findall
+    return [_sms_intent({_SMS_KEYWORDS[w] for w in findall(t.casefold())}) for t in texts]
+
+
+def route_to_agent(state: OrchestratorState) -> str:
+    """Routing function — decides which agent runs next based on intent."""
+    outputs = state["agent_outputs"]
+
+    # Only hard-stop for real emergencies
+    if state["escalated"]:
+        escalation = state.get("escalation_reason", "")
+        is_emergency = any(w in escalation.lower() for w in ["emergency", "severe pain", "trauma", "bleeding"])
+        if is_emergency:
+            return "finalize"
+        # Otherwise, clear escalation and continue routing
+        state["escalated"] = False
+
+    trigger = state["trigger_type"]
+    intent = outputs["concierge"].get("refined_intent", state["intent"]) if "concierge" in outputs else None
+    route = _ROUTES.get((
+        trigger if trigger in _TRIGGERS else None,
+        frozenset(outputs),
+        intent if intent in _ROUTED_INTENTS else None,
+    ), "finalize")
+
+    if route is _MANUAL:
+        target = state["payload"].get("agent", "concierge")
+        return target if target in _MANUAL_AGENTS and target not in outputs else "finalize"
+    return route
+
+
 async def run_concierge_node(state: OrchestratorState) -> OrchestratorState:
     """Execute Concierge agent."""
     result = await run_concierge(
@@ -207,7 +268,7 @@ async def finalize_node(state: OrchestratorState) -> OrchestratorState:
 
 
 # Build the graph
-def build_orchestrator_graph():
+def build_orchestrator_graph(checkpointer=None):
     """Build the LangGraph state machine for the orchestrator."""
     graph = StateGraph(OrchestratorState)
 
@@ -234,36 +295,84 @@ def build_orchestrator_graph():
     # Finalize ends the graph
     graph.add_edge("finalize", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
 
+# Singleton compiled graph. Checkpoints are dropped once an interaction completes;
+# failed ones are kept for a retry, up to MAX_RESUMABLE, oldest evicted first.
+checkpointer = MemorySaver()
+orchestrator = build_orchestrator_graph(checkpointer)
 
-# Singleton compiled graph
-orchestrator = build_orchestrator_graph()
+MAX_RESUMABLE = 1000
+_resumable: OrderedDict[str, None] = OrderedDict()  # thread ids, oldest first
 
 
-async def run_interaction(event: TriggerEvent) -> dict:
+async def _keep_resumable(thread_id: str):
+    if thread_id in _resumable:  # failed again on resume — already kept
+        return
+    if len(_resumable) >= MAX_RESUMABLE:
+        oldest, _ = _resumable.popitem(last=False)
+        await checkpointer.adelete_thread(oldest)
+    _resumable[thread_id] = None
+
+# Per-interaction defaults; mutable fields (agent_outputs) are filled in per call
+_STATE_TEMPLATE = MappingProxyType({
+    "intent": None,
+    "current_agent": None,
+    "escalated": False,
+    "escalation_reason": None,
+    "completed": False,
+    "steps": 0,
+})
+
+
+async def run_interaction(event: TriggerEvent, graph=None) -> dict:
     """
     Main entry point — run a complete interaction through the orchestrator.
+    `graph` overrides the module singleton (e.g. the one held on app.state).
+    Passing the interaction_id of a failed run resumes it instead of starting over.
     """
-    initial_state: OrchestratorState = {
-        "interaction_id": str(uuid.uuid4()),
-        "workspace_id": event.workspace_id,
-        "patient_ref": event.patient_ref,
-        "provider_ref": event.provider_ref,
-        "trigger_type": event.event_type,
-        "intent": None,
-        "payload": event.payload,
-        "agent_outputs": {},
-        "current_agent": None,
-        "escalated": False,
-        "escalation_reason": None,
-        "completed": False,
-        "steps": 0,
-    }
-
-    start = datetime.utcnow()
-    result = await orchestrator.ainvoke(initial_state)
-    duration_ms = int((datetime.utcnow() - start).total_seconds() * 1000)
+    graph = graph or orchestrator
+    interaction_id = event.interaction_id or str(uuid.uuid4())
+    # Namespaced by workspace, so an interaction_id from another tenant can
+    # neither resume nor overwrite (or delete) that tenant's checkpoint
+    thread_id = f"{event.workspace_id}:{interaction_id}"
+    config = {"configurable": {"thread_id": thread_id}}
+
+    start = perf_counter_ns()
+    try:
+        resume = False
+        if event.interaction_id is not None:
+            snapshot = await graph.aget_state(config)
+            resume = bool(snapshot.next)
+        if resume:
+            result = await graph.ainvoke(None, config)
+        else:
+            result = await graph.ainvoke(
+                {
+                    **_STATE_TEMPLATE,
+                    "interaction_id": interaction_id,
+                    "workspace_id": event.workspace_id,
+                    "patient_ref": event.patient_ref,
+                    "provider_ref": event.provider_ref,
+                    "trigger_type": event.event_type,
+                    "payload": event.payload,
+                    "agent_outputs": {},
+                },
+                config,
+            )
+    except Exception as e:
+        await _keep_resumable(thread_id)
+        return {
+            "interaction_id": interaction_id,
+            "error": f"{type(e).__name__}: {e}",
+            "resumable": True,
+            "duration_ms": (perf_counter_ns() - start) // 1_000_000,
+        }
+    duration_ms = (perf_counter_ns() - start) // 1_000_000
+
+    _resumable.pop(thread_id, None)
+    await checkpointer.adelete_thread(thread_id)
 
     return {
         "interaction_id": result["interaction_id"],
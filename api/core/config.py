@@ -1,20 +1,43 @@
+from functools import cached_property
 from pydantic_settings import BaseSettings
-from typing import List
 
 
 class Settings(BaseSettings):
     # Environment
     environment: str = "dev"
+    log_level: str = "INFO"  # DEBUG adds Vapi request/tool traces (includes PHI — never in production)
 
     # Supabase
     supabase_url: str = ""
     supabase_service_role_key: str = ""
+    supabase_http_max_connections: int = 32  # the default to_thread pool never runs more than 32 queries at once
 
     # LLM — provider-agnostic
     llm_provider: str = "openai"
     openai_api_key: str = ""
     llm_model_primary: str = "gpt-4o"  # Orchestrator, Diagnostician, Auditor
     llm_model_fast: str = "gpt-4o-mini"  # Concierge, Liaison
+    llm_prompt_cache_key: str = "agentic-dentist"
+    llm_max_tokens_primary: int = 1500  # Diagnostician briefing cards, audits
+    llm_max_tokens_fast: int = 800  # Concierge replies, Liaison drafts (also local tier)
+    llm_latency_tier: str = "standard"  # "priority" → OpenAI priority processing (billed higher)
+
+    # Local model — OpenAI-compatible server (e.g. vLLM with a 4-bit quantized model,
+    # started with --enable-prefix-caching so the shared system prompt is reused).
+    # Concierge tries it first when set, falling back to the fast tier on low confidence.
+    llm_local_base_url: str = ""
+    llm_model_local: str = "meta-llama/Llama-3.2-1B-Instruct"
+    llm_local_min_confidence: float = 0.7
+
+    # LLM dispatch — calls in flight at once across all agents
+    llm_max_concurrency: int = 16
+    llm_http_max_connections: int = 100
+    llm_http_max_keepalive: int = 50
+
+    # LLM response cache — auditor/diagnostician prompts keyed by SHA-256
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_max_entries: int = 10_000
+    llm_redis_url: str = ""
 
     # PHI Encryption
     phi_encryption_key: str = "CHANGE_ME_IN_PRODUCTION"
@@ -25,12 +48,12 @@ class Settings(BaseSettings):
     # CORS
     frontend_url: str = "https://agentic-dentist.vercel.app"
 
-    @property
-    def cors_origins(self) -> List[str]:
+    @cached_property
+    def cors_origins(self) -> tuple[str, ...]:
         origins = [self.frontend_url]
         if self.environment == "dev":
             origins.append("http://localhost:3000")
-        return origins
+        return tuple(origins)
 
     # Future
     vapi_api_key: str = ""
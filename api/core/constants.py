@@ -0,0 +1,7 @@
+"""Shared immutable constants."""
+
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# Read-only stand-in for omitted dict arguments — never a shared mutable default
+EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
@@ -4,27 +4,74 @@ All agent code calls this module — never OpenAI directly.
 Swapping providers is a config change, not a rewrite.
 """
 
+from functools import lru_cache
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_core.language_models import BaseChatModel
 from api.core.config import settings
 
 
-def get_llm(tier: str = "primary") -> BaseChatModel:
+@lru_cache(maxsize=None)
+def _http_client() -> httpx.AsyncClient:
+    """One connection pool (HTTP/2, kept-alive TLS) shared by every LLM tier."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive,
+        ),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_llm(tier: str = "primary", max_tokens: int | None = None) -> BaseChatModel:
     """
     Get an LLM instance by tier.
+    Instances are cached per (tier, max_tokens) — ChatOpenAI is safe for concurrent
+    ainvoke, and reusing it keeps its HTTP connection pool warm.
     
     Tiers:
         - "primary": GPT-4o — complex reasoning (Orchestrator, Diagnostician, Auditor)
         - "fast": GPT-4o-mini — routing, templates (Concierge, Liaison)
+        - "local": self-hosted quantized model — Concierge first pass
+
+    max_tokens defaults to the tier's LLM_MAX_TOKENS_* setting. To tune it, take
+    the p95 of response.usage_metadata["output_tokens"] over a day of traffic for
+    the agents on that tier and add ~25% headroom; replies that hit the cap are
+    cut mid-JSON and only survive via repair.
     """
+    if max_tokens is None:
+        max_tokens = settings.llm_max_tokens_primary if tier == "primary" else settings.llm_max_tokens_fast
+
+    if tier == "local":
+        # Any OpenAI-compatible server (vLLM, llama.cpp) — JSON mode constrains decoding
+        return ChatOpenAI(
+            model=settings.llm_model_local,
+            base_url=settings.llm_local_base_url,
+            api_key="local",
+            http_async_client=_http_client(),
+            temperature=0.1,
+            max_tokens=max_tokens,
+            model_kwargs={"response_format": {"type": "json_object"}},
+        )
+
     model = settings.llm_model_primary if tier == "primary" else settings.llm_model_fast
 
     if settings.llm_provider == "openai":
+        # System prompts are a fixed prefix; a stable cache key keeps requests
+        # sharing it on the same OpenAI prompt-cache shard
+        extra_body = {"prompt_cache_key": f"{settings.llm_prompt_cache_key}-{tier}"}
+        if settings.llm_latency_tier == "priority":
+            extra_body["service_tier"] = "priority"
+
         return ChatOpenAI(
             model=model,
             api_key=settings.openai_api_key,
+            http_async_client=_http_client(),
             temperature=0.1,
-            max_tokens=2000,
+            max_tokens=max_tokens,
+            extra_body=extra_body,
         )
     else:
         # Future: add anthropic, cohere, etc.
@@ -40,3 +87,18 @@ def get_primary_llm() -> BaseChatModel:
 def get_fast_llm() -> BaseChatModel:
     """GPT-4o-mini for fast routing."""
     return get_llm("fast")
+
+
+def get_local_llm() -> BaseChatModel | None:
+    """Self-hosted model, or None when LLM_LOCAL_BASE_URL is not configured."""
+    if not settings.llm_local_base_url:
+        return None
+    return get_llm("local")
+
+
+async def aclose_llms() -> None:
+    """Close the shared connection pool. Called from the app lifespan on shutdown."""
+    if _http_client.cache_info().currsize:
+        await _http_client().aclose()
+        _http_client.cache_clear()
+    get_llm.cache_clear()
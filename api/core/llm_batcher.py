@@ -0,0 +1,34 @@
+"""
+Concurrency gate for LLM calls.
+
+OpenAI's chat endpoint is one prompt per request, so there is nothing to
+batch: each call is sent as soon as it arrives, under a shared cap. Bursts of
+agent calls go out concurrently instead of queueing behind each other, and
+never exceed the provider connection budget.
+"""
+
+import asyncio
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from api.core.config import settings
+
+
+class LLMBatcher:
+    """Runs `ainvoke`/`astream` calls with at most max_concurrency in flight."""
+
+    def __init__(self, max_concurrency: int):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def ainvoke(self, llm: BaseChatModel, messages: list[BaseMessage]):
+        """Send a call as soon as a slot is free and wait for its response."""
+        async with self._semaphore:
+            return await llm.ainvoke(messages)
+
+    async def astream(self, llm: BaseChatModel, messages: list[BaseMessage]):
+        """Stream a call under the same concurrency cap."""
+        async with self._semaphore:
+            async for chunk in llm.astream(messages):
+                yield chunk
+
+
+batcher = LLMBatcher(max_concurrency=settings.llm_max_concurrency)
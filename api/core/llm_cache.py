@@ -0,0 +1,77 @@
+"""
+Prompt-hash response cache for idempotent agent calls.
+
+Keys are SHA-256 hashes of model + prompt — raw prompts (and any PHI in them)
+are never stored. Backed by an in-memory TTL cache, mirrored to Redis when
+LLM_REDIS_URL is set so retries landing on another worker still hit.
+"""
+
+import hashlib
+from cachetools import TTLCache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from api.core.config import settings
+from api.core.llm_batcher import batcher
+
+_cache: TTLCache = TTLCache(
+    maxsize=settings.llm_cache_max_entries,
+    ttl=settings.llm_cache_ttl_seconds,
+)
+
+_redis = None
+if settings.llm_redis_url:
+    try:
+        import redis.asyncio as redis_asyncio
+        _redis = redis_asyncio.from_url(settings.llm_redis_url, decode_responses=True)
+    except ImportError:
+        _redis = None
+
+
+def prompt_key(llm: BaseChatModel, messages: list[BaseMessage]) -> str:
+    """SHA-256 of the model name and every message in order."""
+    digest = hashlib.sha256(getattr(llm, "model_name", "").encode())
+    for message in messages:
+        digest.update(b"\n")
+        digest.update(message.content.encode())
+    return digest.hexdigest()
+
+
+async def cached_ainvoke(llm: BaseChatModel, messages: list[BaseMessage]) -> str:
+    """Return the response content for this prompt, calling the LLM on a miss."""
+    key = prompt_key(llm, messages)
+
+    content = _cache.get(key)
+    if content is not None:
+        return content
+
+    if _redis is not None:
+        try:
+            content = await _redis.get(f"llm:{key}")
+        except Exception:
+            content = None
+        if content is not None:
+            _cache[key] = content
+            return content
+
+    response = await batcher.ainvoke(llm, messages)
+    content = response.content
+
+    _cache[key] = content
+    if _redis is not None:
+        try:
+            await _redis.set(f"llm:{key}", content, ex=settings.llm_cache_ttl_seconds)
+        except Exception:
+            pass
+
+    return content
+
+
+async def discard(llm: BaseChatModel, messages: list[BaseMessage]):
+    """Drop a cached response — called when it failed to parse or reported status \"error\"."""
+    key = prompt_key(llm, messages)
+    _cache.pop(key, None)
+    if _redis is not None:
+        try:
+            await _redis.delete(f"llm:{key}")
+        except Exception:
+            pass
@@ -0,0 +1,100 @@
+"""
+Forgiving JSON parsing for LLM output.
+
+Models wrap JSON in markdown fences, add chatter around it, truncate mid-object,
+or emit Python literals, smart quotes and trailing commas. parse_llm_json strips
+the wrapping and, when strict parsing fails, repairs the text instead of failing
+the whole agent call.
+"""
+
+import re
+import orjson
+from json_repair import repair_json
+
+# Checked in order, as the fences always won: a ```json block, a bare ``` block,
+# then the outermost {...} span. An unterminated fence runs to the end.
+_JSON_BLOCK_RES = (
+    re.compile(r"```json\s*(.*?)\s*(?:```|\Z)", re.S),
+    re.compile(r"```\s*(.*?)\s*(?:```|\Z)", re.S),
+    re.compile(r"(\{.*\})", re.S),
+)
+
+
+def extract_json_block(content: str) -> str:
+    """Return the JSON text in an LLM reply."""
+    for pattern in _JSON_BLOCK_RES:
+        if match := pattern.search(content):
+            return match.group(1)
+    return content.strip()
+
+
+def parse_llm_json(content: str) -> dict:
+    """
+    Parse the JSON object in an LLM reply.
+    Raises ValueError when no object can be recovered.
+    """
+    content = extract_json_block(content)
+
+    try:
+        result = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        result = repair_json(content, return_objects=True)
+
+    if not isinstance(result, dict):
+        raise ValueError(f"No JSON object in LLM response: {content[:80]!r}")
+    return result
+
+
+
+class StringFieldStream:
+    """
+    Pulls the text of one string field out of a JSON reply as it streams in.
+
+    feed() takes the next text chunk and returns the newly arrived, unescaped
+    part of `key`'s value — so a client can show the patient-facing sentence
+    while the rest of the structured reply is still being generated.
+    """
+
+    def __init__(self, key: str):
+        self._marker = re.compile(rf'"{re.escape(key)}"\s*:\s*"')
+        self._text = ""
+        self._pos = -1  # start of the not-yet-emitted raw value once the string has opened
+        self._closed = False
+
+    def feed(self, chunk: str) -> str:
+        if self._closed:
+            return ""
+        self._text += chunk
+        if self._pos < 0:
+            match = self._marker.search(self._text)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        text = self._text
+        i = self._pos
+        end = len(text)
+        while i < end:
+            ch = text[i]
+            if ch == '"':
+                self._closed = True
+                break
+            if ch == "\\":
+                # Hold back an escape until it is complete; \u escapes for a
+                # surrogate pair need both halves
+                width = 6 if text[i + 1:i + 2] == "u" else 2
+                if width == 6 and text[i + 2:i + 4].lower() in ("d8", "d9", "da", "db"):
+                    width = 12
+                if i + width > end:
+                    break
+                i += width
+            else:
+                i += 1
+
+        raw, self._pos = text[self._pos:i], i
+        if not raw:
+            return ""
+        try:
+            return orjson.loads(f'"{raw}"')
+        except orjson.JSONDecodeError:
+            return ""
@@ -0,0 +1,36 @@
+"""
+Local-model first pass for high-volume, low-complexity agents.
+
+The Concierge mostly emits a closed-set intent label plus a short reply, which a
+small quantized model served locally handles in tens of milliseconds. Replies
+below the confidence bar (or that fail to parse) return None so the caller falls
+back to the hosted fast tier.
+"""
+
+from langchain_core.messages import BaseMessage
+from api.core.config import settings
+from api.core.llm import get_local_llm
+from api.core.llm_batcher import batcher
+from api.core.llm_json import parse_llm_json
+
+
+async def ainvoke_local(messages: list[BaseMessage]) -> str | None:
+    """Return the local model's reply if it is valid JSON with enough confidence."""
+    llm = get_local_llm()
+    if llm is None:
+        return None
+
+    try:
+        response = await batcher.ainvoke(llm, messages)
+        result = parse_llm_json(response.content)
+    except Exception:
+        return None
+
+    try:
+        confidence = float(result.get("confidence") or 0.0)
+    except (TypeError, ValueError):
+        return None
+    if confidence < settings.llm_local_min_confidence:
+        return None
+
+    return response.content
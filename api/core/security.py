@@ -4,8 +4,16 @@ Security helpers for HIPAA-compliant operations.
 - PHI masking for agent context
 """
 
+import asyncio
+import hashlib
+from cachetools import TTLCache
 from fastapi import HTTPException, Header
-from api.services.supabase_client import get_supabase_admin
+from api.services.supabase_client import execute, get_supabase_admin
+
+# Successful checks only, for 60s — repeat requests in a session skip the round-trips.
+# A revoked token or membership stays accepted for at most that long.
+_user_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_membership_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
 
 
 async def verify_auth(authorization: str = Header(None)) -> dict:
@@ -17,35 +25,46 @@ async def verify_auth(authorization: str = Header(None)) -> dict:
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
 
     token = authorization.replace("Bearer ", "")
+    token_hash = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    if (cached := _user_cache.get(token_hash)) is not None:
+        return cached
+
     supabase = get_supabase_admin()
 
     try:
-        user = supabase.auth.get_user(token)
-        return {"id": user.user.id, "email": user.user.email}
+        user = await asyncio.to_thread(supabase.auth.get_user, token)
+        result = {"id": user.user.id, "email": user.user.email}
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    _user_cache[token_hash] = result
+    return result
+
 
 async def verify_membership(user_id: str, workspace_id: str) -> dict:
     """
     Verify user is an active member of the workspace.
     Returns the membership record.
     """
+    key = (user_id, workspace_id)
+    if (cached := _membership_cache.get(key)) is not None:
+        return cached
+
     supabase = get_supabase_admin()
 
-    result = (
+    result = await execute(
         supabase.table("clinic_memberships")
         .select("id, role, status")
         .eq("profile_id", user_id)
         .eq("clinic_id", workspace_id)
         .eq("status", "active")
         .single()
-        .execute()
     )
 
     if not result.data:
         raise HTTPException(status_code=403, detail="Not a member of this workspace")
 
+    _membership_cache[key] = result.data
     return result.data
 
 
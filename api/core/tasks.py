@@ -0,0 +1,35 @@
+"""
+Background task helper.
+
+asyncio only keeps weak references to tasks, so a bare create_task() can be
+garbage-collected mid-flight and its exception never surfaces. fire_and_forget
+holds a strong reference until the task finishes and logs any failure.
+"""
+
+import asyncio
+import logging
+from typing import Coroutine
+
+logger = logging.getLogger(__name__)
+
+_tasks: set[asyncio.Task] = set()
+
+
+def _on_done(task: asyncio.Task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()!r}")
+
+
+def fire_and_forget(coro: Coroutine, name: str | None = None) -> asyncio.Task:
+    """Schedule a coroutine off the request path."""
+    task = asyncio.create_task(coro, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+async def drain_background_tasks(timeout: float = 5.0):
+    """Wait for pending background tasks — called on shutdown so audit writes land."""
+    if _tasks:
+        await asyncio.wait(set(_tasks), timeout=timeout)
@@ -0,0 +1,41 @@
+"""
+Token-budget helpers for prompt context.
+
+Trimming by token count keeps prompt size predictable regardless of content,
+unlike slicing by characters or bytes.
+"""
+
+import logging
+from functools import lru_cache
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = " …[truncated]"
+
+
+@lru_cache(maxsize=None)
+def _encoding() -> tiktoken.Encoding | None:
+    """
+    Load the gpt-4o tokenizer once. The BPE file is fetched on first use,
+    so a host without network access gets None and a character estimate.
+    """
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating tokens by length: {e}")
+        return None
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Trim `text` to at most `max_tokens` tokens, marking the cut."""
+    enc = _encoding()
+    if enc is None:
+        # ~4 chars per token for English/JSON
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars] + TRUNCATION_MARKER
+
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens]) + TRUNCATION_MARKER
@@ -1,12 +1,51 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.core.config import settings
+from api.core.llm import aclose_llms, get_fast_llm, get_primary_llm
+from api.core.tasks import drain_background_tasks
+from api.agents.orchestrator import orchestrator
+from api.services.audit_batcher import audit_batcher
+from api.services.supabase_client import close_supabase_admin, execute, get_supabase_admin
 from api.routers import health, agents, vapi
 
+logging.basicConfig(level=settings.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def _warm_supabase():
+    """Create the admin client and open its first connection."""
+    supabase = get_supabase_admin()
+    await execute(supabase.table("appointments").select("id").limit(1))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pay client construction and the first connection here, not on the first request
+    app.state.orchestrator = orchestrator
+    audit_batcher.start()
+    # get_llm caches per tier, so these build the clients every agent reuses
+    get_fast_llm()
+    get_primary_llm()
+    try:
+        await _warm_supabase()
+    except Exception as e:
+        logger.warning(f"Supabase warm-up failed: {e}")
+
+    yield
+    # Let background work finish, then flush queued audit rows before the worker exits
+    await drain_background_tasks()
+    await audit_batcher.aclose()
+    await aclose_llms()
+    close_supabase_admin()
+
+
 app = FastAPI(
     title="The Agentic Dentist — API",
     description="AI agent swarm backend for dental practice management",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS — allow Next.js frontend
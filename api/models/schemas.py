@@ -38,6 +38,7 @@ class TriggerEvent(BaseModel):
     patient_ref: Optional[str] = None
     provider_ref: Optional[str] = None
     payload: dict = {}
+    interaction_id: Optional[str] = None  # set to resume a failed interaction
 
 
 # ============================================
@@ -52,6 +53,14 @@ class AgentRunRequest(BaseModel):
     payload: dict = {}
 
 
+class ConciergeStreamRequest(BaseModel):
+    """Concierge input for the SSE streaming endpoint."""
+    workspace_id: str
+    patient_ref: Optional[str] = None
+    intent: Optional[str] = None
+    payload: dict = {}
+
+
 class AgentRunResponse(BaseModel):
     run_id: str
     agent: str
@@ -0,0 +1,97 @@
+"""
+Vapi webhook payloads, decoded straight from the request body with msgspec.
+
+Only the fields the webhook reads are declared — everything else Vapi sends
+(recordings, analysis, full artifacts) is skipped while decoding instead of
+being built into dicts. Vapi sends explicit nulls for fields it omits, so
+every field is Optional. A body that still fails validation can be decoded
+with decode_lenient, which keeps every top-level message field that does fit.
+"""
+
+from typing import Any
+import msgspec
+
+
+class _VapiStruct(msgspec.Struct, rename="camel"):
+    pass
+
+
+class Customer(_VapiStruct):
+    number: str | None = None
+
+
+class Call(_VapiStruct):
+    id: str | None = None
+    metadata: dict[str, Any] | None = None
+    customer: Customer | None = None
+
+
+class FunctionCall(_VapiStruct):
+    name: str | None = None
+    parameters: dict[str, Any] | None = None
+
+
+class ToolFunction(_VapiStruct):
+    name: str | None = None
+    arguments: dict[str, Any] | str | None = None  # JSON string in some API versions
+
+
+class ToolCall(_VapiStruct):
+    id: str | None = None
+    function: ToolFunction | None = None
+
+
+class ConversationMessage(_VapiStruct):
+    role: str | None = None
+    content: Any = None
+    text: Any = None
+
+
+class Artifact(_VapiStruct):
+    messages: list[ConversationMessage] | None = None
+
+
+class VapiMessage(_VapiStruct):
+    type: str | None = None
+    call: Call | None = None
+    function_call: FunctionCall | None = None
+    tool_call_list: list[ToolCall] | None = None
+    tool_calls: list[ToolCall] | None = None
+    artifact: Artifact | None = None
+    messages: list[ConversationMessage] | None = None
+    status: str | None = None
+    summary: str | None = None
+    transcript: str | None = None
+    duration_seconds: float | None = None
+
+    @property
+    def conversation(self) -> list[ConversationMessage]:
+        return (self.artifact and self.artifact.messages) or self.messages or []
+
+
+class VapiWebhook(_VapiStruct):
+    message: VapiMessage | None = None
+
+
+webhook_decoder = msgspec.json.Decoder(VapiWebhook)
+
+
+def decode_lenient(raw: bytes) -> VapiMessage:
+    """
+    Decode a body that failed validation, dropping only the message fields
+    whose shape doesn't match — so an odd tool call list doesn't also lose
+    the event type and call metadata.
+    """
+    body = msgspec.json.decode(raw)
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, dict):
+        return VapiMessage()
+
+    fields = {}
+    for key, value in message.items():
+        try:
+            msgspec.convert({key: value}, VapiMessage)
+        except msgspec.ValidationError:
+            continue
+        fields[key] = value
+    return msgspec.convert(fields, VapiMessage)
@@ -3,11 +3,12 @@ Agent API routes.
 Endpoints for triggering agents and the orchestrator.
 """
 
-from fastapi import APIRouter, Depends
-from api.models.schemas import TriggerEvent, AgentRunRequest, AgentRunResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from api.models.schemas import TriggerEvent, AgentRunRequest, AgentRunResponse, ConciergeStreamRequest
 from api.core.security import verify_auth, verify_membership
 from api.agents.orchestrator import run_interaction
-from api.agents.concierge.agent import run_concierge
+from api.agents.concierge.agent import run_concierge, stream_concierge
 from api.agents.diagnostician.agent import run_diagnostician
 from api.agents.liaison.agent import run_liaison
 from api.agents.auditor.agent import run_auditor
@@ -20,6 +21,7 @@ router = APIRouter()
 @router.post("/trigger", summary="Trigger the orchestrator with an event")
 async def trigger_interaction(
     event: TriggerEvent,
+    request: Request,
     user: dict = Depends(verify_auth),
 ):
     """
@@ -27,7 +29,7 @@ async def trigger_interaction(
     The orchestrator classifies intent and routes to appropriate agents.
     """
     await verify_membership(user["id"], event.workspace_id)
-    result = await run_interaction(event)
+    result = await run_interaction(event, graph=getattr(request.app.state, "orchestrator", None))
     return result
 
 
@@ -97,6 +99,29 @@ async def run_agent_directly(
         )
 
 
+@router.post("/concierge/stream", summary="Stream a Concierge response over SSE")
+async def stream_concierge_response(
+    request: ConciergeStreamRequest,
+    user: dict = Depends(verify_auth),
+):
+    """
+    Run the Concierge and stream its reply as Server-Sent Events.
+    The patient-facing response text arrives in deltas as it is generated; the
+    last frame carries the parsed result.
+    """
+    await verify_membership(user["id"], request.workspace_id)
+
+    return StreamingResponse(
+        stream_concierge(
+            workspace_id=request.workspace_id,
+            patient_ref=request.patient_ref,
+            intent=request.intent,
+            payload=request.payload,
+        ),
+        media_type="text/event-stream",
+    )
+
+
 @router.get("/status", summary="Get agent swarm status")
 async def agent_status():
     """Returns the current status of all agents."""
@@ -10,9 +10,9 @@ async def health_check():
     """Health check endpoint — verifies config and connectivity."""
     supabase_ok = False
     try:
-        from api.services.supabase_client import get_supabase_admin
+        from api.services.supabase_client import execute, get_supabase_admin
         client = get_supabase_admin()
-        client.table("profiles").select("id").limit(1).execute()
+        await execute(client.table("profiles").select("id").limit(1))
         supabase_ok = True
     except Exception:
         pass
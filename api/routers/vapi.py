@@ -5,9 +5,15 @@ The Concierge can check availability, book, cancel, and reschedule
 during live phone calls via Vapi function calling.
 """
 
+import httpx
+from cachetools import TTLCache
 from fastapi import APIRouter, Request
+from fastapi.responses import ORJSONResponse, Response
+from postgrest.exceptions import APIError
+from api.core.tasks import fire_and_forget
 from api.agents.orchestrator import run_interaction
 from api.models.schemas import TriggerEvent
+from api.models.vapi import Call, FunctionCall, ToolFunction, VapiMessage, decode_lenient, webhook_decoder
 from api.services.supabase_client import log_audit_event
 from api.services.appointments import (
     lookup_patient_by_name,
@@ -18,14 +24,30 @@ from api.services.appointments import (
     reschedule_appointment,
     get_patient_appointments,
 )
-import json
+from typing import Any, Awaitable, Callable
+import asyncio
+import logging
+import msgspec
+import orjson
 import os
-import traceback
+import re
 
-router = APIRouter()
+
+# orjson for the final dump of dict replies (jsonable_encoder still runs first)
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
 
 DEFAULT_WORKSPACE_ID = os.environ.get("DEFAULT_WORKSPACE_ID", "")
 
+# Tools that act on a specific patient and need patient_name
+PATIENT_NAME_TOOLS = frozenset({"book_appointment", "cancel_appointment", "reschedule_appointment", "get_patient_appointments"})
+# Tools that don't change the schedule — safe to run side by side
+READ_ONLY_TOOLS = frozenset({"check_availability", "find_next_available", "get_patient_appointments"})
+# A short user message containing any of these is an intent, not a name
+NOT_A_NAME_WORDS = ("book", "cancel", "reschedule", "appointment", "schedule", "yes", "no", "okay", "sure", "please", "thank")
+# Whole words only, so names like "Noah" or "Antonio" aren't mistaken for "no"
+_NOT_A_NAME_RE = re.compile(r"\b(" + "|".join(NOT_A_NAME_WORDS) + r")(s|ed|ing)?\b", re.IGNORECASE)
+
 CONCIERGE_SYSTEM_PROMPT = """You are the Concierge AI assistant for a dental practice. You are the first point of contact for patients calling in.
 
 IMPORTANT — ALWAYS collect the patient's full name before taking any action:
@@ -51,7 +73,7 @@ Key behaviors:
 - If someone is in pain or mentions an emergency, prioritize getting them help
 - NEVER mention that you are an AI unless directly asked"""
 
-TOOLS = [
+TOOLS = (
     {
         "type": "function",
         "function": {
@@ -140,197 +162,273 @@ TOOLS = [
             },
         },
     },
-]
+)
+
+
+ASSISTANT_CONFIG = {
+    "model": {
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "systemPrompt": CONCIERGE_SYSTEM_PROMPT,
+        "temperature": 0.3,
+    },
+    "serverUrl": "https://agentic-dentist-api-production.up.railway.app/api/vapi/webhook",
+    "tools": TOOLS,
+    "voice": {
+        "provider": "11labs",
+        "voiceId": "21m00Tcm4TlvDq8ikWAM",
+    },
+    "firstMessage": "Hello! Thank you for calling the dental practice. May I have your full name so I can pull up your file?",
+    "transcriber": {
+        "provider": "deepgram",
+        "model": "nova-2",
+        "language": "en",
+    },
+}
+
+# Only metadata varies per call — serialize the rest once and splice it in.
+# metadata is the last key, so the prefix ends right where its value starts.
+_ASSISTANT_PREFIX = orjson.dumps({"assistant": {**ASSISTANT_CONFIG, "metadata": None}})[:-len(b"null}}")]
+
+
+# Tracebacks already logged in the last 10s, by (type, message prefix)
+_recent_failures: TTLCache = TTLCache(maxsize=256, ttl=10)
+
+
+def _log_failure(e: Exception, msg: str, *args):
+    """
+    Log an unexpected failure with its traceback once per 10s; repeats in that
+    window get a single line. A bad deploy fails every call the same way, and
+    formatting a stack per request makes the incident worse.
+    """
+    key = (type(e).__name__, str(e)[:64])
+    if key in _recent_failures:
+        logger.error(msg + " (repeat): %s: %s", *args, type(e).__name__, e)
+        return
+    _recent_failures[key] = True
+    logger.exception(msg + ": %s: %s", *args, type(e).__name__, e)
+
+
+# Acks are identical every time — one pre-rendered Response serves them all
+_OK = Response(content=b'{"ok":true}', media_type="application/json")
+
+
+def _conversation_name(message: VapiMessage) -> str | None:
+    """
+    The caller's name, taken from their first short reply in the conversation
+    (the answer to "May I have your full name?"). Skips replies that are clearly
+    intents rather than names.
+    """
+    for m in message.conversation:
+        content = m.content or m.text
+        if m.role != "user" or not isinstance(content, str):
+            continue
+        content = content.strip()
+        if content and len(content) < 60 and not _NOT_A_NAME_RE.search(content):
+            return content
+    return None
+
+
+async def _on_assistant_request(message: VapiMessage, call: Call, metadata: dict, workspace_id: str):
+    """Dynamic assistant config with tools."""
+    return Response(
+        content=_ASSISTANT_PREFIX + orjson.dumps(metadata) + b"}}",
+        media_type="application/json",
+    )
+
+
+async def _on_function_call(message: VapiMessage, call: Call, metadata: dict, workspace_id: str):
+    """Execute real scheduling tools."""
+    function_call = message.function_call or FunctionCall()
+    fn_name = function_call.name
+    fn_params = function_call.parameters or {}
+    logger.debug("function-call function=%s params=%s workspace=%s", fn_name, fn_params, workspace_id)
+
+    # Inject the caller's name if the tool needs it and the AI didn't provide it
+    if fn_name in PATIENT_NAME_TOOLS and not fn_params.get("patient_name"):
+        if name := _conversation_name(message):
+            fn_params["patient_name"] = name
+            logger.debug("injected patient_name=%r into %s", name, fn_name)
+
+    result = await handle_function_call(fn_name, fn_params, workspace_id, metadata.get("patient_ref"))
+    return {"result": result}
+
+
+async def _run_tool_calls(calls: list[tuple[str, dict]], workspace_id: str, patient_ref: str | None) -> list[str]:
+    """
+    Run a turn's tool calls, returning results in call order.
+    Consecutive read-only calls run concurrently; a write waits for the reads
+    before it and blocks the calls after it, so "cancel, then book the freed
+    slot" still happens in that order.
+    """
+    results: list[str] = []
+    reads = []
+    for fn_name, params in calls:
+        call = handle_function_call(fn_name, params, workspace_id, patient_ref)
+        if fn_name in READ_ONLY_TOOLS:
+            reads.append(call)
+            continue
+        if reads:
+            results += await asyncio.gather(*reads)
+            reads = []
+        results.append(await call)
+    if reads:
+        results += await asyncio.gather(*reads)
+    return results
+
+
+async def _on_tool_calls(message: VapiMessage, call: Call, metadata: dict, workspace_id: str):
+    """Vapi server-side tool execution."""
+    tool_calls = message.tool_call_list or message.tool_calls or []
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("found %d messages in conversation", len(message.conversation))
+        for m in message.conversation:
+            logger.debug("message role=%s content=%.200s", m.role, m.content)
+
+    conversation_name = _conversation_name(message)
+    logger.debug("extracted name %r from conversation", conversation_name)
+
+    calls = []
+    for tc in tool_calls:
+        fn = tc.function or ToolFunction()
+        fn_name = fn.name
+        fn_params = fn.arguments or {}
+        if isinstance(fn_params, str):
+            try:
+                fn_params = orjson.loads(fn_params)
+            except orjson.JSONDecodeError:
+                fn_params = None
+            if not isinstance(fn_params, dict):
+                fn_params = {}
+
+        # Inject extracted patient name if the tool needs it and AI didn't provide it
+        if conversation_name and not fn_params.get("patient_name"):
+            if fn_name in PATIENT_NAME_TOOLS:
+                fn_params["patient_name"] = conversation_name
+                logger.debug("injected patient_name=%r into %s", conversation_name, fn_name)
+
+        logger.debug("tool function=%s params=%s workspace=%s", fn_name, fn_params, workspace_id)
+        calls.append((fn_name, fn_params))
+
+    outputs = await _run_tool_calls(calls, workspace_id, metadata.get("patient_ref"))
+    results = [
+        {"toolCallId": tc.id, "result": result_str}
+        for tc, result_str in zip(tool_calls, outputs)
+    ]
+
+    return {"results": results}
+
+
+async def _on_status_update(message: VapiMessage, call: Call, metadata: dict, workspace_id: str):
+    status = message.status or ""
+    if workspace_id:
+        await log_audit_event(
+            workspace_id=workspace_id,
+            actor_type="system",
+            actor_id="vapi",
+            action=f"call_{status}",
+            resource_type="call",
+            resource_id=call.id,
+            metadata={
+                "status": status,
+                "phone_number": (call.customer and call.customer.number) or "unknown",
+            },
+        )
+    return _OK
+
+
+async def _on_end_of_call(message: VapiMessage, call: Call, metadata: dict, workspace_id: str):
+    summary = message.summary or ""
+    transcript_text = message.transcript or ""
+    duration_seconds = message.duration_seconds or 0
+
+    if workspace_id:
+        await log_audit_event(
+            workspace_id=workspace_id,
+            actor_type="system",
+            actor_id="vapi",
+            action="call_completed",
+            resource_type="call",
+            resource_id=call.id,
+            metadata={
+                "duration_seconds": duration_seconds,
+                "summary": summary[:500] if summary else None,
+            },
+        )
+
+        # Vapi only needs the ack — analyze the call after responding
+        fire_and_forget(
+            # Slice now so the background task holds ~1KB, not the whole transcript
+            _process_post_call(workspace_id, call.id, (summary or transcript_text)[:1000]),
+            name=f"vapi:post_call:{call.id}",
+        )
+
+    return _OK
+
+
+EventHandler = Callable[[VapiMessage, Call, dict, str], Awaitable[Any]]
+
+# Transcripts and any other event types just get the ack
+_EVENT_HANDLERS: dict[str, EventHandler] = {
+    "assistant-request": _on_assistant_request,
+    "function-call": _on_function_call,
+    "tool-calls": _on_tool_calls,
+    "status-update": _on_status_update,
+    "end-of-call-report": _on_end_of_call,
+}
+
+
 @router.post("/webhook")
 async def vapi_webhook(request: Request):
     """Main Vapi webhook endpoint."""
     try:
-        body = await request.json()
-        print(f"[VAPI RAW] {json.dumps(body)[:3000]}")
-        message = body.get("message") or {}
-        event_type = message.get("type", "")
-
-        # Safe extraction — Vapi sends null for call/metadata in some events
-        call = message.get("call") or {}
-        metadata = call.get("metadata") or {}
-        if not metadata.get("workspace_id"):
-            metadata["workspace_id"] = DEFAULT_WORKSPACE_ID
-        workspace_id = metadata.get("workspace_id", "") or DEFAULT_WORKSPACE_ID
-        patient_ref = metadata.get("patient_ref")
-
-        print(f"[VAPI] event={event_type}, workspace={workspace_id}")
-
-        # assistant-request: Dynamic assistant config with tools
-        if event_type == "assistant-request":
-            return {
-                "assistant": {
-                    "model": {
-                        "provider": "openai",
-                        "model": "gpt-4o-mini",
-                        "systemPrompt": CONCIERGE_SYSTEM_PROMPT,
-                        "temperature": 0.3,
-                    },
-                    "serverUrl": "https://agentic-dentist-api-production.up.railway.app/api/vapi/webhook",
-                    "tools": TOOLS,
-                    "voice": {
-                        "provider": "11labs",
-                        "voiceId": "21m00Tcm4TlvDq8ikWAM",
-                    },
-                    "firstMessage": "Hello! Thank you for calling the dental practice. May I have your full name so I can pull up your file?",
-                    "transcriber": {
-                        "provider": "deepgram",
-                        "model": "nova-2",
-                        "language": "en",
-                    },
-                    "metadata": metadata,
-                }
-            }
-
-        # function-call: Execute real scheduling tools
-        if event_type == "function-call":
-            function_call = message.get("functionCall") or {}
-            fn_name = function_call.get("name", "")
-            fn_params = function_call.get("parameters") or {}
-            print(f"[VAPI DEBUG] function={fn_name}, params={fn_params}, workspace_id={workspace_id}")
-            print(f"[VAPI FUNCTION-CALL] message keys: {list(message.keys())}")
-
-            # Try to extract patient name from conversation for this format too
-            artifact = message.get("artifact") or {}
-            messages_list = artifact.get("messages") or message.get("messages") or []
-            if messages_list and not fn_params.get("patient_name"):
-                for m in messages_list:
-                    role = m.get("role", "")
-                    content = (m.get("content") or m.get("text") or "").strip()
-                    if role == "user" and content and len(content) < 60:
-                        lower = content.lower()
-                        if not any(w in lower for w in ["book", "cancel", "reschedule", "appointment", "schedule", "yes", "no", "okay", "sure", "please", "thank"]):
-                            if fn_name in ("book_appointment", "cancel_appointment", "reschedule_appointment", "get_patient_appointments"):
-                                fn_params["patient_name"] = content
-                                print(f"[VAPI INJECT] Added patient_name='{content}' to {fn_name}")
-                            break
-
-            result = await handle_function_call(fn_name, fn_params, workspace_id, patient_ref)
-            return {"result": result}
-        # tool-calls: Vapi server-side tool execution
-        if event_type == "tool-calls":
-            tool_calls = message.get("toolCallList") or message.get("toolCalls") or []
-
-            # Log all available keys in the message to find conversation context
-            print(f"[VAPI TOOL-CALLS] message keys: {list(message.keys())}")
-
-            # Vapi may send conversation messages — try to extract patient name
-            conversation_name = None
-            artifact = message.get("artifact") or {}
-            messages_list = artifact.get("messages") or message.get("messages") or []
-            if messages_list:
-                print(f"[VAPI MESSAGES] Found {len(messages_list)} messages in conversation")
-                for m in messages_list:
-                    print(f"[VAPI MSG] role={m.get('role')}, content={str(m.get('content',''))[:200]}")
-
-            # Extract name: look for the user's first substantive response
-            # (their reply to "May I have your full name?")
-            for m in messages_list:
-                role = m.get("role", "")
-                content = (m.get("content") or m.get("text") or "").strip()
-                if role == "user" and content and len(content) < 60:
-                    # First short user message is likely the name
-                    # Skip messages that are clearly intents, not names
-                    lower = content.lower()
-                    if not any(w in lower for w in ["book", "cancel", "reschedule", "appointment", "schedule", "yes", "no", "okay", "sure", "please", "thank"]):
-                        conversation_name = content
-                        print(f"[VAPI NAME EXTRACTED] '{conversation_name}' from conversation")
-                        break
-
-            results = []
-            for tc in tool_calls:
-                fn = tc.get("function") or {}
-                fn_name = fn.get("name", "")
-                fn_params = fn.get("arguments") or {}
-                if isinstance(fn_params, str):
-                    try:
-                        fn_params = json.loads(fn_params)
-                    except:
-                        fn_params = {}
-                tc_id = tc.get("id", "")
-
-                # Inject extracted patient name if the tool needs it and AI didn't provide it
-                if conversation_name and not fn_params.get("patient_name"):
-                    if fn_name in ("book_appointment", "cancel_appointment", "reschedule_appointment", "get_patient_appointments"):
-                        fn_params["patient_name"] = conversation_name
-                        print(f"[VAPI INJECT] Added patient_name='{conversation_name}' to {fn_name}")
-
-                print(f"[VAPI TOOL] function={fn_name}, params={fn_params}, workspace={workspace_id}")
-
-                result_str = await handle_function_call(fn_name, fn_params, workspace_id, patient_ref)
-                results.append({
-                    "toolCallId": tc_id,
-                    "result": result_str,
-                })
-
-            return {"results": results}
-        # status-update
-        if event_type == "status-update":
-            status = message.get("status", "")
-            if workspace_id:
-                await log_audit_event(
-                    workspace_id=workspace_id,
-                    actor_type="system",
-                    actor_id="vapi",
-                    action=f"call_{status}",
-                    resource_type="call",
-                    resource_id=call.get("id"),
-                    metadata={
-                        "status": status,
-                        "phone_number": (call.get("customer") or {}).get("number", "unknown"),
-                    },
-                )
-            return {"ok": True}
-
-        # end-of-call-report
-        if event_type == "end-of-call-report":
-            summary = message.get("summary", "")
-            transcript_text = message.get("transcript", "")
-            duration_seconds = message.get("durationSeconds", 0)
-
-            if workspace_id:
-                await log_audit_event(
-                    workspace_id=workspace_id,
-                    actor_type="system",
-                    actor_id="vapi",
-                    action="call_completed",
-                    resource_type="call",
-                    resource_id=call.get("id"),
-                    metadata={
-                        "duration_seconds": duration_seconds,
-                        "summary": summary[:500] if summary else None,
-                    },
-                )
-
-                # Post-call processing
-                try:
-                    event = TriggerEvent(
-                        event_type="inbound_call",
-                        workspace_id=workspace_id,
-                        payload={
-                            "text": summary or transcript_text[:1000],
-                            "channel": "phone",
-                            "call_id": call.get("id"),
-                            "post_call": True,
-                        },
-                    )
-                    await run_interaction(event)
-                except Exception as e:
-                    print(f"[VAPI] Post-call orchestrator error: {e}")
-
-            return {"ok": True}
-
-        # transcript or unknown events
-        return {"ok": True}
+        raw = await request.body()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("raw body: %s", raw[:3000].decode(errors="replace"))
+        try:
+            message = webhook_decoder.decode(raw).message or VapiMessage()
+        except msgspec.ValidationError as e:
+            # Still answer — a dropped assistant-request leaves the call without an assistant
+            logger.warning("webhook body failed validation (%s); decoding leniently", e)
+            message = decode_lenient(raw)
+        event_type = message.type
+
+        call = message.call or Call()
+        metadata = call.metadata or {}
+        workspace_id = metadata["workspace_id"] = metadata.get("workspace_id") or DEFAULT_WORKSPACE_ID
+
+        logger.info("event=%s workspace=%s", event_type, workspace_id)
+
+        handler = _EVENT_HANDLERS.get(event_type)
+        if handler is None:
+            return _OK
+        return await handler(message, call, metadata, workspace_id)
+
+    except Exception as e:
+        _log_failure(e, "Webhook handling failed")
+        return _OK
 
+
+async def _process_post_call(workspace_id: str, call_id: str | None, text: str):
+    """Run the orchestrator over a finished call's summary (or transcript)."""
+    try:
+        event = TriggerEvent(
+            event_type="inbound_call",
+            workspace_id=workspace_id,
+            payload={
+                "text": text,
+                "channel": "phone",
+                "call_id": call_id,
+                "post_call": True,
+            },
+        )
+        result = await run_interaction(event)
     except Exception as e:
-        print(f"[VAPI ERROR] {type(e).__name__}: {e}")
-        traceback.print_exc()
-        return {"ok": True}
+        logger.exception("Post-call orchestrator error for call %s: %s", call_id, e)
+        return
+    if result.get("error"):
+        logger.error("Post-call orchestrator error for call %s: %s", call_id, result["error"])
 
 
 async def resolve_patient(workspace_id: str, params: dict, patient_ref: str | None) -> tuple[str | None, str | None, str | None]:
@@ -341,9 +439,9 @@ async def resolve_patient(workspace_id: str, params: dict, patient_ref: str | No
     patient_name = params.get("patient_name", "")
 
     if patient_name:
-        print(f"[VAPI LOOKUP] Resolving patient_name='{patient_name}', workspace={workspace_id}")
+        logger.debug("resolving patient_name=%r workspace=%s", patient_name, workspace_id)
         lookup = await lookup_patient_by_name(workspace_id, patient_name)
-        print(f"[VAPI LOOKUP RESULT] {lookup}")
+        logger.debug("lookup result: %s", lookup)
 
         if lookup["found"] and lookup["patient"]:
             return lookup["patient"]["id"], lookup["patient"]["full_name"], None
@@ -359,167 +457,244 @@ async def resolve_patient(workspace_id: str, params: dict, patient_ref: str | No
     return None, None, "I need the patient's full name before I can help with that. Could you tell me your full name?"
 
 
+def _dumps(obj: dict) -> str:
+    # Vapi expects each tool result as a JSON string. It goes back into the
+    # model's context, so results carry only what the model can act on —
+    # start times rather than slot dicts, no row ids or timestamps.
+    return orjson.dumps(obj).decode()
+
+
+def _day_options(days: list[dict]) -> list[dict]:
+    """The first three days of an availability search, slots reduced to start times."""
+    return [
+        {"date": day["date"], "day_name": day["day_name"], "slots": [s["start"] for s in day["slots"]]}
+        for day in days[:3]
+    ]
+
+
+def _days_summary(options: list[dict]) -> str:
+    """'Monday 2025-01-06: 09:00, 09:30; Tuesday ...' from _day_options output, two slots a day."""
+    return "; ".join([f"{day['day_name']} {day['date']}: {', '.join(day['slots'][:2])}" for day in options])
+
+
+async def _check_availability(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    date = params.get("date", "")
+    duration = params.get("duration_minutes", 30)
+    slots = await check_availability(workspace_id, date, duration)
+    if slots:
+        starts = [s["start"] for s in slots[:6]]
+        return _dumps({
+            "available": True,
+            "date": date,
+            "slots": starts,
+            "message": f"On {date}, I have these openings: {', '.join(starts)}",
+        })
+    return _dumps({
+        "available": False,
+        "message": f"I'm sorry, there are no openings on {date}. Would you like me to check another date?",
+    })
+
+
+async def _find_next_available(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    duration = params.get("duration_minutes", 30)
+    results = await find_next_available(workspace_id, duration)
+    if results:
+        options = _day_options(results)
+        return _dumps({
+            "found": True,
+            "options": options,
+            "message": f"Here are the next available slots: {_days_summary(options)}. Which works best for you?",
+        })
+    return _NO_SLOTS_SOON
+
+
+async def _book_appointment(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
+    if error:
+        return _dumps({"booked": False, "message": error})
+    logger.debug(
+        "book date=%s time=%s type=%s patient=%s name=%s workspace=%s",
+        params.get("date"), params.get("time"), params.get("appointment_type"), patient_id, verified_name, workspace_id,
+    )
+    result = await book_appointment(
+        workspace_id=workspace_id,
+        date=params.get("date", ""),
+        time=params.get("time", ""),
+        appointment_type=params.get("appointment_type", "general"),
+        patient_id=patient_id,
+        patient_name=verified_name,
+        source="phone",
+    )
+    logger.debug("book result: %s", result)
+    if result.get("success"):
+        appt = result["appointment"]
+        return _dumps({
+            "booked": True,
+            "message": f"I've booked your {appt['type']} appointment for {appt['date']} at {appt['time']}. You'll receive a confirmation shortly.",
+        })
+    return _dumps({
+        "booked": False,
+        "message": result.get("error", "Sorry, I couldn't book that slot."),
+    })
+
+
+async def _cancel_appointment(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
+    if error:
+        return _dumps({"cancelled": False, "message": error})
+    result = await cancel_appointment(
+        workspace_id=workspace_id,
+        patient_id=patient_id,
+        reason=params.get("reason", "Patient requested cancellation"),
+    )
+    if result.get("success"):
+        cancelled = result["cancelled_appointment"]
+        msg = f"I've cancelled your {cancelled['type']} appointment on {cancelled['date']} at {cancelled['time']}."
+        if result.get("suggested_reschedule"):
+            msg += f" Would you like to reschedule? I have openings on: {_days_summary(_day_options(result['suggested_reschedule']))}"
+        return _dumps({"cancelled": True, "message": msg})
+    return _dumps({
+        "cancelled": False,
+        "message": result.get("error", "I couldn't find an appointment to cancel."),
+    })
+
+
+async def _slot_is_free(workspace_id: str, date: str, time: str) -> bool | None:
+    """Whether a 30-minute visit fits at date/time; None if the date can't be parsed."""
+    try:
+        slots = await check_availability(workspace_id, date, 30)
+    except ValueError:
+        return None
+    return any(s["start"] == time for s in slots)
+
+
+async def _reschedule_appointment(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    new_date = params.get("new_date", "")
+    new_time = params.get("new_time", "")
+    # Resolving the patient and probing the new slot are independent round-trips.
+    # Slots share one grid, so a time too short for 30 minutes is too short for any
+    # visit — a miss skips the appointment lookup and the write.
+    (patient_id, verified_name, error), slot_free = await asyncio.gather(
+        resolve_patient(workspace_id, params, patient_ref),
+        _slot_is_free(workspace_id, new_date, new_time),
+    )
+    if error:
+        return _dumps({"rescheduled": False, "message": error})
+    if slot_free is False:
+        return _SLOT_TAKEN
+
+    appts = await get_patient_appointments(workspace_id, patient_id, use_cache=False)
+    if appts:
+        result = await reschedule_appointment(
+            workspace_id=workspace_id,
+            appointment_id=appts[0]["id"],
+            new_date=new_date,
+            new_time=new_time,
+        )
+        if result.get("success"):
+            r = result["rescheduled"]
+            return _dumps({
+                "rescheduled": True,
+                "message": f"Done! I've moved your appointment from {r['old_date']} at {r['old_time']} to {r['new_date']} at {r['new_time']}.",
+            })
+        return _dumps({
+            "rescheduled": False,
+            "message": result.get("error", "That time isn't available."),
+        })
+    return _NOTHING_TO_RESCHEDULE
+
+
+async def _get_patient_appointments(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
+    if error:
+        return _dumps({"found": False, "message": error})
+    appts = await get_patient_appointments(workspace_id, patient_id)
+    if appts:
+        appt_list = []
+        for a in appts:
+            appt_list.append(f"{a['appointment_type']} on {a['start_time'][:10]} at {a['start_time'][11:16]}")
+        return _dumps({
+            "found": True,
+            "appointments": [
+                {"type": a["appointment_type"], "date": a["start_time"][:10], "time": a["start_time"][11:16]}
+                for a in appts
+            ],
+            "message": f"I found {len(appts)} upcoming appointment(s): {', '.join(appt_list)}",
+        })
+    return _NO_APPOINTMENTS
+
+
+async def _transfer_to_human(params: dict, workspace_id: str, patient_ref: str | None) -> str:
+    reason = params.get("reason", "patient request")
+    if workspace_id:
+        await log_audit_event(
+            workspace_id=workspace_id,
+            actor_type="agent",
+            actor_id="concierge_voice",
+            action="transfer_to_human",
+            metadata={"reason": reason},
+        )
+    return _TRANSFERRED
+
+
+FunctionHandler = Callable[[dict, str, str | None], Awaitable[str]]
+
+_HANDLERS: dict[str, FunctionHandler] = {
+    "check_availability": _check_availability,
+    "find_next_available": _find_next_available,
+    "book_appointment": _book_appointment,
+    "cancel_appointment": _cancel_appointment,
+    "reschedule_appointment": _reschedule_appointment,
+    "get_patient_appointments": _get_patient_appointments,
+    "transfer_to_human": _transfer_to_human,
+}
+
+# Fixed results, encoded once
+_NO_SLOTS_SOON = _dumps({
+    "found": False,
+    "message": "I'm sorry, I couldn't find any available slots in the next two weeks. Let me connect you with the front desk.",
+})
+_SLOT_TAKEN = _dumps({"rescheduled": False, "message": "The requested time is not available"})
+_NOTHING_TO_RESCHEDULE = _dumps({
+    "rescheduled": False,
+    "message": "I don't see any upcoming appointments to reschedule.",
+})
+_NO_APPOINTMENTS = _dumps({
+    "found": False,
+    "message": "I don't see any upcoming appointments on file.",
+})
+_TRANSFERRED = _dumps({"transferred": True, "message": "Transferring you now."})
+_TOOL_ERROR = _dumps({
+    "error": True,
+    "message": "I'm sorry, I encountered an issue. Let me connect you with the front desk.",
+})
+_BAD_ARGUMENTS = _dumps({
+    "error": True,
+    "message": "I didn't quite catch that date or time. Could you say it again?",
+})
+
+# Failures a live call should expect — logged without a traceback
+_BACKEND_ERRORS = (TimeoutError, httpx.HTTPError, APIError)
+
+
 async def handle_function_call(
     fn_name: str, params: dict, workspace_id: str, patient_ref: str | None
 ) -> str:
     """Execute real scheduling tools during a live voice call."""
+    handler = _HANDLERS.get(fn_name)
+    if handler is None:
+        return _dumps({"error": f"Unknown function: {fn_name}"})
 
+    # The caller is on the line — every failure gets a spoken answer, not a 500
     try:
-        if fn_name == "check_availability":
-            date = params.get("date", "")
-            duration = params.get("duration_minutes", 30)
-            slots = await check_availability(workspace_id, date, duration)
-            if slots:
-                slot_list = ", ".join([s["start"] for s in slots[:6]])
-                return json.dumps({
-                    "available": True,
-                    "date": date,
-                    "slots": slots[:6],
-                    "message": f"On {date}, I have these openings: {slot_list}",
-                })
-            return json.dumps({
-                "available": False,
-                "message": f"I'm sorry, there are no openings on {date}. Would you like me to check another date?",
-            })
-
-        if fn_name == "find_next_available":
-            duration = params.get("duration_minutes", 30)
-            results = await find_next_available(workspace_id, duration)
-            if results:
-                summary_parts = []
-                for day in results[:3]:
-                    slots_str = ", ".join([s["start"] for s in day["slots"][:2]])
-                    summary_parts.append(f"{day['day_name']} {day['date']}: {slots_str}")
-                summary = "; ".join(summary_parts)
-                return json.dumps({
-                    "found": True,
-                    "options": results[:3],
-                    "message": f"Here are the next available slots: {summary}. Which works best for you?",
-                })
-            return json.dumps({
-                "found": False,
-                "message": "I'm sorry, I couldn't find any available slots in the next two weeks. Let me connect you with the front desk.",
-            })
-
-        if fn_name == "book_appointment":
-            patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
-            if error:
-                return json.dumps({"booked": False, "message": error})
-            print(f"[VAPI BOOK] date={params.get('date')}, time={params.get('time')}, type={params.get('appointment_type')}, patient={patient_id}, name={verified_name}, workspace={workspace_id}")
-            try:
-                result = await book_appointment(
-                    workspace_id=workspace_id,
-                    date=params.get("date", ""),
-                    time=params.get("time", ""),
-                    appointment_type=params.get("appointment_type", "general"),
-                    patient_id=patient_id,
-                    patient_name=verified_name,
-                    source="phone",
-                )
-                print(f"[VAPI BOOK RESULT] {result}")
-                if result.get("success"):
-                    appt = result["appointment"]
-                    return json.dumps({
-                        "booked": True,
-                        "message": f"I've booked your {appt['type']} appointment for {appt['date']} at {appt['time']}. You'll receive a confirmation shortly.",
-                    })
-                return json.dumps({
-                    "booked": False,
-                    "message": result.get("error", "Sorry, I couldn't book that slot."),
-                })
-            except Exception as e:
-                print(f"[VAPI BOOK ERROR] {e}")
-                traceback.print_exc()
-                return json.dumps({"error": True, "message": f"Booking failed: {str(e)}"})
-
-        if fn_name == "cancel_appointment":
-            patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
-            if error:
-                return json.dumps({"cancelled": False, "message": error})
-            result = await cancel_appointment(
-                workspace_id=workspace_id,
-                patient_id=patient_id,
-                reason=params.get("reason", "Patient requested cancellation"),
-            )
-            if result.get("success"):
-                cancelled = result["cancelled_appointment"]
-                msg = f"I've cancelled your {cancelled['type']} appointment on {cancelled['date']} at {cancelled['time']}."
-                if result.get("suggested_reschedule"):
-                    rebook_parts = []
-                    for day in result["suggested_reschedule"][:3]:
-                        slots_str = ", ".join([s["start"] for s in day["slots"][:2]])
-                        rebook_parts.append(f"{day['day_name']} {day['date']}: {slots_str}")
-                    msg += f" Would you like to reschedule? I have openings on: {'; '.join(rebook_parts)}"
-                return json.dumps({"cancelled": True, "message": msg})
-            return json.dumps({
-                "cancelled": False,
-                "message": result.get("error", "I couldn't find an appointment to cancel."),
-            })
-
-        if fn_name == "reschedule_appointment":
-            patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
-            if error:
-                return json.dumps({"rescheduled": False, "message": error})
-            appts = await get_patient_appointments(workspace_id, patient_id)
-            if appts:
-                result = await reschedule_appointment(
-                    workspace_id=workspace_id,
-                    appointment_id=appts[0]["id"],
-                    new_date=params.get("new_date", ""),
-                    new_time=params.get("new_time", ""),
-                )
-                if result.get("success"):
-                    r = result["rescheduled"]
-                    return json.dumps({
-                        "rescheduled": True,
-                        "message": f"Done! I've moved your appointment from {r['old_date']} at {r['old_time']} to {r['new_date']} at {r['new_time']}.",
-                    })
-                return json.dumps({
-                    "rescheduled": False,
-                    "message": result.get("error", "That time isn't available."),
-                })
-            return json.dumps({
-                "rescheduled": False,
-                "message": "I don't see any upcoming appointments to reschedule.",
-            })
-
-        if fn_name == "get_patient_appointments":
-            patient_id, verified_name, error = await resolve_patient(workspace_id, params, patient_ref)
-            if error:
-                return json.dumps({"found": False, "message": error})
-            appts = await get_patient_appointments(workspace_id, patient_id)
-            if appts:
-                appt_list = []
-                for a in appts:
-                    appt_list.append(f"{a['appointment_type']} on {a['start_time'][:10]} at {a['start_time'][11:16]}")
-                return json.dumps({
-                    "found": True,
-                    "appointments": appts,
-                    "message": f"I found {len(appts)} upcoming appointment(s): {', '.join(appt_list)}",
-                })
-            return json.dumps({
-                "found": False,
-                "message": "I don't see any upcoming appointments on file.",
-            })
-
-        if fn_name == "transfer_to_human":
-            reason = params.get("reason", "patient request")
-            if workspace_id:
-                await log_audit_event(
-                    workspace_id=workspace_id,
-                    actor_type="agent",
-                    actor_id="concierge_voice",
-                    action="transfer_to_human",
-                    metadata={"reason": reason},
-                )
-            return json.dumps({"transferred": True, "message": "Transferring you now."})
-
-        return json.dumps({"error": f"Unknown function: {fn_name}"})
-
+        return await handler(params, workspace_id, patient_ref)
+    except ValueError as e:
+        # Malformed date/time from the model
+        logger.warning("Tool %s got bad arguments: %s", fn_name, e)
+        return _BAD_ARGUMENTS
+    except _BACKEND_ERRORS as e:
+        logger.warning("Tool %s failed: %s: %s", fn_name, type(e).__name__, e)
+        return _TOOL_ERROR
     except Exception as e:
-        print(f"[VAPI TOOL ERROR] {fn_name}: {e}")
-        traceback.print_exc()
-        return json.dumps({
-            "error": True,
-            "message": f"I'm sorry, I encountered an issue. Let me connect you with the front desk.",
-        })
\ No newline at end of file
+        _log_failure(e, "Tool %s failed", fn_name)
+        return _TOOL_ERROR
@@ -0,0 +1,38 @@
+"""
+Short-lived read-through caches for appointment-service lookups.
+
+Voice conversations repeat the same patient lookup and availability search
+turn after turn; these caches absorb the repeats. Keys always start with the
+workspace_id so writes can invalidate a single workspace.
+"""
+
+from cachetools import TTLCache
+
+
+class WorkspaceCache:
+    """TTLCache keyed by tuples whose first element is the workspace_id."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: tuple):
+        return self._cache.get(key)
+
+    def set(self, key: tuple, value) -> None:
+        self._cache[key] = value
+
+    def clear_workspace(self, workspace_id: str) -> None:
+        for key in [k for k in list(self._cache.keys()) if k[0] == workspace_id]:
+            self._cache.pop(key, None)
+
+
+# Patient records change rarely; availability must not drift from bookings
+patient_cache = WorkspaceCache(maxsize=5_000, ttl=300)
+availability_cache = WorkspaceCache(maxsize=5_000, ttl=15)
+patient_appointments_cache = WorkspaceCache(maxsize=5_000, ttl=10)
+
+
+def clear_schedule(workspace_id: str) -> None:
+    """Drop every cached view of a workspace's appointments — call after any write."""
+    availability_cache.clear_workspace(workspace_id)
+    patient_appointments_cache.clear_workspace(workspace_id)
@@ -5,9 +5,15 @@ Agents call these functions to read/write the appointments table.
 from zoneinfo import ZoneInfo
 CLINIC_TZ = ZoneInfo("America/Toronto")
 from datetime import datetime, timedelta
-from api.services.supabase_client import get_supabase_admin, log_audit_event
+from api.services.supabase_client import execute, get_supabase_admin, log_audit_event
+from api.services.appointment_cache import (
+    availability_cache,
+    clear_schedule,
+    patient_appointments_cache,
+    patient_cache,
+)
 from api.core.config import settings
-import json
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,9 +42,44 @@ BUSINESS_HOURS = {
 }
 
 
+# Lookups currently hitting the database, so concurrent tool calls share one query
+_patient_lookups: dict[tuple, asyncio.Task] = {}
+
+
+async def _lookup_and_cache(key: tuple, workspace_id: str, patient_name: str) -> dict:
+    try:
+        result = await _lookup_patient_by_name(workspace_id, patient_name)
+        if result["found"] or result["candidates"]:
+            patient_cache.set(key, result)
+        return result
+    finally:
+        _patient_lookups.pop(key, None)
+
+
 async def lookup_patient_by_name(
     workspace_id: str,
     patient_name: str,
+) -> dict:
+    """
+    Cached wrapper around _lookup_patient_by_name.
+    Only matches are cached — a miss may be a patient registered a moment later.
+    Callers asking for the same name while a lookup is in flight await that lookup.
+    """
+    key = (workspace_id, patient_name.strip().lower())
+    cached = patient_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _patient_lookups.get(key)
+    if task is None:
+        task = _patient_lookups[key] = asyncio.create_task(_lookup_and_cache(key, workspace_id, patient_name))
+    # shield: one caller being cancelled must not cancel the lookup for the others
+    return await asyncio.shield(task)
+
+
+async def _lookup_patient_by_name(
+    workspace_id: str,
+    patient_name: str,
 ) -> dict:
     """
     Look up a patient by name in the encrypted patients table.
@@ -58,10 +99,10 @@ async def lookup_patient_by_name(
     supabase = get_supabase_admin()
 
     try:
-        result = supabase.rpc("list_patients", {
+        result = await execute(supabase.rpc("list_patients", {
             "p_workspace_id": workspace_id,
             "p_encryption_key": settings.phi_encryption_key,
-        }).execute()
+        }))
     except Exception as e:
         logger.error(f"Patient lookup RPC failed: {e}")
         return {
@@ -81,12 +122,7 @@ async def lookup_patient_by_name(
             "message": "No patients found in this workspace.",
         }
 
-    # DEBUG: Log what the RPC returns so we can see the field names
-    print(f"[PATIENT LOOKUP] Searching for: '{patient_name}'")
-    print(f"[PATIENT LOOKUP] Total patients in workspace: {len(patients)}")
-    if patients:
-        print(f"[PATIENT LOOKUP] Sample patient keys: {list(patients[0].keys())}")
-        print(f"[PATIENT LOOKUP] Sample patient data: {patients[0]}")
+    logger.debug("patient lookup %r: %d patients in workspace, fields %s", patient_name, len(patients), list(patients[0]))
 
     # Normalize search name
     search = patient_name.strip().lower()
@@ -94,7 +130,7 @@ async def lookup_patient_by_name(
     # 1) Exact match (case-insensitive)
     exact = [p for p in patients if (p.get("full_name") or "").strip().lower() == search]
     if len(exact) == 1:
-        print(f"[PATIENT LOOKUP] Exact match: {exact[0]['full_name']}")
+        logger.debug("patient lookup exact match: %s", exact[0]["full_name"])
         return {
             "found": True,
             "patient": _safe_patient(exact[0]),
@@ -105,7 +141,7 @@ async def lookup_patient_by_name(
     # 2) Partial / contains match
     partial = [p for p in patients if search in (p.get("full_name") or "").strip().lower()]
     if len(partial) == 1:
-        print(f"[PATIENT LOOKUP] Partial match: {partial[0]['full_name']}")
+        logger.debug("patient lookup partial match: %s", partial[0]["full_name"])
         return {
             "found": True,
             "patient": _safe_patient(partial[0]),
@@ -130,7 +166,7 @@ async def lookup_patient_by_name(
             if (p.get("full_name") or "").strip().lower().split()[0] == first_name
         ]
         if len(first_matches) == 1:
-            print(f"[PATIENT LOOKUP] First name match: {first_matches[0]['full_name']}")
+            logger.debug("patient lookup first name match: %s", first_matches[0]["full_name"])
             return {
                 "found": True,
                 "patient": _safe_patient(first_matches[0]),
@@ -152,14 +188,14 @@ async def lookup_patient_by_name(
         ratio = SequenceMatcher(None, search, name).ratio()
         if ratio >= 0.65:  # 65% similarity threshold
             fuzzy_matches.append((p, ratio))
-            print(f"[PATIENT LOOKUP] Fuzzy match: '{name}' score={ratio:.2f}")
+            logger.debug("patient lookup fuzzy candidate %r score=%.2f", name, ratio)
 
     # Sort by best match
     fuzzy_matches.sort(key=lambda x: x[1], reverse=True)
 
     if len(fuzzy_matches) == 1:
         best = fuzzy_matches[0][0]
-        print(f"[PATIENT LOOKUP] Single fuzzy match: {best['full_name']} (score={fuzzy_matches[0][1]:.2f})")
+        logger.debug("patient lookup single fuzzy match: %s score=%.2f", best["full_name"], fuzzy_matches[0][1])
         return {
             "found": True,
             "patient": _safe_patient(best),
@@ -171,7 +207,7 @@ async def lookup_patient_by_name(
         # If top match is significantly better than second, use it
         if fuzzy_matches[0][1] - fuzzy_matches[1][1] >= 0.15:
             best = fuzzy_matches[0][0]
-            print(f"[PATIENT LOOKUP] Best fuzzy match: {best['full_name']} (score={fuzzy_matches[0][1]:.2f}, gap={fuzzy_matches[0][1] - fuzzy_matches[1][1]:.2f})")
+            logger.debug("patient lookup best fuzzy match: %s score=%.2f runner-up=%.2f", best["full_name"], fuzzy_matches[0][1], fuzzy_matches[1][1])
             return {
                 "found": True,
                 "patient": _safe_patient(best),
@@ -214,7 +250,7 @@ async def get_appointments_for_date(
     start = f"{date}T00:00:00Z"
     end = f"{date}T23:59:59Z"
 
-    result = (
+    result = await execute(
         supabase.table("appointments")
         .select("id, title, appointment_type, start_time, end_time, duration_minutes, status, patient_id")
         .eq("workspace_id", workspace_id)
@@ -222,7 +258,6 @@ async def get_appointments_for_date(
         .lte("start_time", end)
         .neq("status", "cancelled")
         .order("start_time")
-        .execute()
     )
 
     return result.data or []
@@ -236,7 +271,7 @@ async def get_appointments_for_range(
     """Get appointments for a date range."""
     supabase = get_supabase_admin()
 
-    result = (
+    result = await execute(
         supabase.table("appointments")
         .select("id, title, appointment_type, start_time, end_time, duration_minutes, status, patient_id")
         .eq("workspace_id", workspace_id)
@@ -244,7 +279,6 @@ async def get_appointments_for_range(
         .lte("start_time", f"{end_date}T23:59:59Z")
         .neq("status", "cancelled")
         .order("start_time")
-        .execute()
     )
 
     return result.data or []
@@ -254,8 +288,17 @@ async def get_patient_appointments(
     workspace_id: str,
     patient_id: str,
     upcoming_only: bool = True,
+    use_cache: bool = True,
 ) -> list[dict]:
-    """Get appointments for a specific patient."""
+    """
+    Get appointments for a specific patient. Cached briefly — a call reads them turn after turn.
+    Callers that pick an appointment to write to pass use_cache=False.
+    """
+    key = (workspace_id, patient_id, upcoming_only)
+    cached = patient_appointments_cache.get(key) if use_cache else None
+    if cached is not None:
+        return cached
+
     supabase = get_supabase_admin()
 
     query = (
@@ -270,20 +313,29 @@ async def get_patient_appointments(
     if upcoming_only:
         query = query.gte("start_time", datetime.now(CLINIC_TZ).isoformat())
 
-    result = query.execute()
-    return result.data or []
+    result = await execute(query)
+    appointments = result.data or []
+    patient_appointments_cache.set(key, appointments)
+    return appointments
 
 
 async def check_availability(
     workspace_id: str,
     date: str,
     duration_minutes: int = 30,
+    use_cache: bool = True,
 ) -> list[dict]:
     """
     Find available time slots for a given date and duration.
     Returns list of available slots: [{"start": "09:00", "end": "09:30"}, ...]
+    The day's bookings are cached briefly; writes pass use_cache=False so a
+    slot is never booked against another worker's stale view.
     """
-    existing = await get_appointments_for_date(workspace_id, date)
+    key = (workspace_id, date)
+    existing = availability_cache.get(key) if use_cache else None
+    if existing is None:
+        existing = await get_appointments_for_date(workspace_id, date)
+        availability_cache.set(key, existing)
 
     # Parse date to check if it's a business day
     check_date = datetime.strptime(date, "%Y-%m-%d")
@@ -334,6 +386,11 @@ async def find_next_available(
     Find the next available slots across multiple days.
     Returns: [{"date": "2026-02-25", "slots": [{"start": "09:00", "end": "09:30"}, ...]}]
     """
+    key = (workspace_id, duration_minutes, days_ahead, max_results)
+    cached = availability_cache.get(key)
+    if cached is not None:
+        return cached
+
     results = []
     today = datetime.now(CLINIC_TZ).date()
 
@@ -369,6 +426,7 @@ async def find_next_available(
         if len(results) >= max_results:
             break
 
+    availability_cache.set(key, results)
     return results
 
 
@@ -396,7 +454,7 @@ async def book_appointment(
         title = f"{type_label} — {patient_name}" if patient_name else type_label
 
     # Verify slot is available
-    slots = await check_availability(workspace_id, date, duration)
+    slots = await check_availability(workspace_id, date, duration, use_cache=False)
     is_available = any(s["start"] == time for s in slots)
 
     if not is_available:
@@ -409,12 +467,11 @@ async def book_appointment(
     # Validate patient exists if patient_id is provided
     if patient_id:
         supabase_check = get_supabase_admin()
-        patient_result = (
+        patient_result = await execute(
             supabase_check.table("patients")
             .select("id, external_ref, is_active")
             .eq("id", patient_id)
             .eq("workspace_id", workspace_id)
-            .execute()
         )
         if not patient_result.data:
             return {
@@ -429,7 +486,7 @@ async def book_appointment(
                 "error": "This patient record is inactive. Please reactivate before booking.",
             }
 
-    result = (
+    result = await execute(
         supabase.table("appointments")
         .insert({
             "workspace_id": workspace_id,
@@ -443,11 +500,11 @@ async def book_appointment(
             "source": source,
             "status": "scheduled",
         })
-        .execute()
     )
 
     if result.data:
         appt = result.data[0] if isinstance(result.data, list) else result.data
+        clear_schedule(workspace_id)
 
         await log_audit_event(
             workspace_id=workspace_id,
@@ -493,17 +550,16 @@ async def cancel_appointment(
 
     # Find the appointment
     if appointment_id:
-        result = (
+        result = await execute(
             supabase.table("appointments")
             .select("*")
             .eq("id", appointment_id)
             .eq("workspace_id", workspace_id)
             .single()
-            .execute()
         )
     elif patient_id:
         # Cancel next upcoming appointment for this patient
-        result = (
+        result = await execute(
             supabase.table("appointments")
             .select("*")
             .eq("workspace_id", workspace_id)
@@ -513,7 +569,6 @@ async def cancel_appointment(
             .order("start_time")
             .limit(1)
             .single()
-            .execute()
         )
     else:
         return {"success": False, "error": "Need appointment_id or patient_id"}
@@ -524,10 +579,11 @@ async def cancel_appointment(
     appt = result.data
 
     # Cancel it
-    supabase.table("appointments").update({
+    await execute(supabase.table("appointments").update({
         "status": "cancelled",
         "cancellation_reason": reason,
-    }).eq("id", appt["id"]).execute()
+    }).eq("id", appt["id"]))
+    clear_schedule(workspace_id)
 
     await log_audit_event(
         workspace_id=workspace_id,
@@ -569,23 +625,25 @@ async def reschedule_appointment(
     supabase = get_supabase_admin()
 
     # Get current appointment
-    current = (
+    current = await execute(
         supabase.table("appointments")
         .select("*")
         .eq("id", appointment_id)
         .eq("workspace_id", workspace_id)
         .single()
-        .execute()
     )
 
     if not current.data:
         return {"success": False, "error": "Appointment not found"}
 
     appt = current.data
+    # Moving a cancelled appointment would silently re-book it
+    if appt.get("status") == "cancelled":
+        return {"success": False, "error": "That appointment has already been cancelled"}
     duration = appt.get("duration_minutes", 30)
 
     # Check if new slot is available
-    slots = await check_availability(workspace_id, new_date, duration)
+    slots = await check_availability(workspace_id, new_date, duration, use_cache=False)
     is_available = any(s["start"] == new_time for s in slots)
 
     if not is_available:
@@ -599,11 +657,12 @@ async def reschedule_appointment(
     new_start = datetime.fromisoformat(f"{new_date}T{new_time}:00")
     new_end = new_start + timedelta(minutes=duration)
 
-    supabase.table("appointments").update({
+    await execute(supabase.table("appointments").update({
         "start_time": new_start.isoformat(),
         "end_time": new_end.isoformat(),
         "status": "scheduled",
-    }).eq("id", appointment_id).execute()
+    }).eq("id", appointment_id))
+    clear_schedule(workspace_id)
 
     await log_audit_event(
         workspace_id=workspace_id,
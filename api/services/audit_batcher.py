@@ -0,0 +1,102 @@
+"""
+Audit-log write batcher.
+
+log_audit_event enqueues rows here; a background flusher writes them with one
+multi-row INSERT once max_batch rows are pending or max_wait_ms has passed,
+whichever comes first. One round-trip per batch instead of one per event.
+"""
+
+import asyncio
+import logging
+from api.core.tasks import fire_and_forget
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBatcher:
+    def __init__(self, max_batch: int = 200, max_wait_ms: int = 50, max_pending: int = 10_000):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._worker: asyncio.Task | None = None
+        self._collecting: list[dict] = []
+        self._flushing: asyncio.Future | None = None
+
+    def start(self):
+        """Start the flusher. The app lifespan calls this; enqueue also starts it lazily."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def enqueue(self, row: dict):
+        """Queue a row for the next flush. Never blocks the caller."""
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # Backlogged — write this row on its own rather than drop it
+            fire_and_forget(self._flush([row]), name="audit:overflow")
+
+    async def aclose(self):
+        """Stop the flusher and write whatever is still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        # A write already under way finishes on its own; wait for it rather than repeat it
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+        # Rows the flusher had dequeued but not yet handed to a flush
+        rows, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        for i in range(0, len(rows), self.max_batch):
+            await self._flush(rows[i:i + self.max_batch])
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._collecting = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(self._collecting) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._collecting.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch, self._collecting = self._collecting, []
+            # Shielded: cancelling the worker at shutdown must not abandon (or
+            # cause aclose to repeat) an INSERT that is already running
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def _flush(self, rows: list[dict]):
+        # Imported here — supabase_client imports this module for log_audit_event
+        from api.services.supabase_client import execute, get_supabase_admin
+
+        table = None
+        try:
+            table = get_supabase_admin().table("audit_log")
+            await execute(table.insert(rows))
+            return
+        except Exception as e:
+            if table is None:
+                logger.error(f"Audit log flush of {len(rows)} rows failed: {e}")
+                return
+            if len(rows) == 1:
+                logger.error(f"Audit log write failed for {rows[0].get('action')} in {rows[0].get('workspace_id')}: {e}")
+                return
+            logger.warning(f"Audit log flush of {len(rows)} rows failed, retrying row by row: {e}")
+
+        # One bad row (e.g. an unknown workspace_id) must not sink the rest of the batch
+        results = await asyncio.gather(*(execute(table.insert(row)) for row in rows), return_exceptions=True)
+        for row, result in zip(rows, results):
+            if isinstance(result, Exception):
+                logger.error(f"Audit log write failed for {row.get('action')} in {row.get('workspace_id')}: {result}")
+
+
+audit_batcher = AuditBatcher()
@@ -3,23 +3,62 @@ Supabase admin client — service role, bypasses RLS.
 Used for agent operations and encrypted PHI access.
 """
 
+import asyncio
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
 from api.core.config import settings
+from api.services.audit_batcher import audit_batcher
 
 _client: Client | None = None
+_http: httpx.Client | None = None
 
 
 def get_supabase_admin() -> Client:
     """Get or create the Supabase admin client (singleton)."""
-    global _client
+    global _client, _http
     if _client is None:
+        # One pool for every query. execute() runs queries on worker threads, so
+        # size it to that concurrency and keep TLS connections alive between calls.
+        _http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.supabase_http_max_connections,
+                max_keepalive_connections=settings.supabase_http_max_connections,
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
         _client = create_client(
             settings.supabase_url,
             settings.supabase_service_role_key,
+            options=SyncClientOptions(httpx_client=_http),
         )
     return _client
 
 
+def close_supabase_admin():
+    """Close the client's connection pool. Called from the app lifespan on shutdown."""
+    global _client, _http
+    if _http is not None:
+        _http.close()
+    _client = _http = None
+
+
+# Queries beyond the pool size wait here rather than holding a worker thread
+# while they wait for a connection
+_db_slots = asyncio.Semaphore(settings.supabase_http_max_connections)
+
+
+async def execute(query):
+    """
+    Run a built query in a worker thread and return its response.
+    The client is sync — calling .execute() directly blocks the event loop
+    (and every other in-flight request) for the whole round-trip.
+    """
+    async with _db_slots:
+        return await asyncio.to_thread(query.execute)
+
+
 async def log_audit_event(
     workspace_id: str,
     actor_type: str,  # "user" | "agent" | "system"
@@ -29,9 +68,11 @@ async def log_audit_event(
     resource_id: str | None = None,
     metadata: dict | None = None,
 ):
-    """Write to the immutable audit log."""
-    supabase = get_supabase_admin()
-    supabase.table("audit_log").insert(
+    """
+    Write to the immutable audit log.
+    Rows are queued and flushed in batches — this returns without a round-trip.
+    """
+    audit_batcher.enqueue(
         {
             "workspace_id": workspace_id,
             "actor_type": actor_type,
@@ -41,4 +82,4 @@ async def log_audit_event(
             "resource_id": resource_id,
             "metadata": metadata or {},
         }
-    ).execute()
+    )